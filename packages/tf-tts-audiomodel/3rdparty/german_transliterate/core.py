@@ -6,8 +6,15 @@
 # Copyright 2020 by repodiac (see https://github.com/repodiac, also for information how to provide attribution to this work)
 #
 
+import collections
+import functools
+import itertools
+import math
+import os
 import re
 import sys
+import threading
+import time
 from num2words import num2words
 
 
@@ -396,6 +403,17 @@ class RegExConfig(GTConfig):
                 '\\b1000\\b': ('1000', 'tausend'),
             }
 
+            # SPECIAL_TRANSLITERATE precompiled (in order) and indexed by trigger character
+            # invariant: a pattern can only match a word containing its replaced term (first item of the tuple), so
+            # the first character of that term is the trigger to consider the pattern at all
+            self.SPECIAL_TRANSLITERATE_COMPILED = [(re.compile(pat), tup_repl)
+                                                   for pat, tup_repl in self.SPECIAL_TRANSLITERATE.items()]
+            self.SPECIAL_TRANSLITERATE_TRIGGER = {}
+            for idx, (_, tup_repl) in enumerate(self.SPECIAL_TRANSLITERATE_COMPILED):
+                self.SPECIAL_TRANSLITERATE_TRIGGER.setdefault(tup_repl[0][0], []).append(idx)
+            self.DETECT_SPECIAL_TRIGGER = re.compile(
+                '[' + re.escape(''.join(self.SPECIAL_TRANSLITERATE_TRIGGER.keys())) + ']')
+
             self.CURRENCY_MAGNITUDE = ['\\bmia\\b', '\\bmia\.\\b', '\\bmrd\\b', '\\bmrd\.\\b', '\\bmd\\b', '\\bmd\.\\b',
                                        '\\bmilliarde[n]{0,1}\\b', '\\bbrd\\b', '\\bbrd\.\\b', '\\bbilliarde[n]{0,1}\\b',
                                        '\\bmio\\b', '\\bmio\.\\b', '\\bmill\\b', '\\bmill\.\\b',
@@ -416,6 +434,12 @@ class RegExConfig(GTConfig):
             self.DETECT_ORDINAL = re.compile('[\(\[]{0,1}\d+\.[\)\]]{0,1}')
             self.DETECT_NUMBER = re.compile('([\+\-]{0,1}\d+[\d\.,]*)')
             self.DETECT_WHITESPACE_SEQ = re.compile('\s+')
+            # candidates of sentence boundaries: [.!?] and a single space before a capitalized (not uppercase) word,
+            # further conditions see GermanTransliterate._sentences
+            self.DETECT_SENTENCE_BOUNDARY = re.compile('[\.!?] (?=[A-ZÄÖÜ][a-zäöüß])')
+            self.DETECT_DIGIT = re.compile('\d')
+            # necessary for a match of DETECT_ABBREVIATION (two capital letters, optionally separated by '.')
+            self.DETECT_UPPERCASE_RUN = re.compile('[A-ZÄÖÜ]\.{0,1}[A-ZÄÖÜ]')
 
             # static regex patterns but contents depending on input parameter config (thus set to None, initially)
             self.DETECT_CURRENCY_SYMBOL = None
@@ -430,6 +454,363 @@ class RegExConfig(GTConfig):
             raise e
 
 
+class GermanNumberSpeller:
+    """
+    Table-driven German number speller producing exactly the output of num2words(lang='de') for cardinals
+    (int and float) with an absolute value below MAX_VALUE, ordinals and years (both as str of digits, as used by
+    GermanTransliterate); everything else is left to num2words (see spell)
+    """
+
+    MAX_VALUE = 10 ** 6
+
+    LOW = ['null', 'eins', 'zwei', 'drei', 'vier', 'fünf', 'sechs', 'sieben', 'acht', 'neun', 'zehn', 'elf',
+           'zwölf', 'dreizehn', 'vierzehn', 'fünfzehn', 'sechzehn', 'siebzehn', 'achtzehn', 'neunzehn', 'zwanzig']
+    TENS = ['', '', 'zwanzig', 'dreißig', 'vierzig', 'fünfzig', 'sechzig', 'siebzig', 'achtzig', 'neunzig']
+
+    # ordinal suffixes of num2words, the first matching ending of the cardinal is replaced (then "te" is appended)
+    ORDINAL_ENDINGS = (('eins', 'ers'), ('drei', 'drit'), ('acht', 'ach'), ('sieben', 'sieb'), ('ig', 'igs'),
+                       ('ert', 'erts'), ('end', 'ends'), ('ion', 'ions'), ('nen', 'ns'), ('rde', 'rds'), ('rden', 'rds'))
+
+    DETECT_DIGITS = re.compile('[0-9]+\\.{0,1}$')
+
+    def __init__(self):
+        # cardinals 0..999, every larger number (below MAX_VALUE) is composed of two of them
+        self.below_thousand = [self._below_thousand(n) for n in range(1000)]
+
+    def _below_hundred(self, n):
+        if n <= 20:
+            return self.LOW[n]
+        tens, unit = divmod(n, 10)
+        if not unit:
+            return self.TENS[tens]
+        return ('ein' if unit == 1 else self.LOW[unit]) + 'und' + self.TENS[tens]
+
+    def _below_thousand(self, n):
+        hundreds, rest = divmod(n, 100)
+        if not hundreds:
+            return self._below_hundred(n)
+        return ('ein' if hundreds == 1 else self.LOW[hundreds]) + 'hundert' + (self._below_hundred(rest) if rest else '')
+
+    def cardinal(self, n):
+        """
+        :param n: int with abs(n) < MAX_VALUE
+        :return: cardinal number word
+        """
+        if n < 0:
+            return 'minus ' + self.cardinal(-n)
+        thousands, rest = divmod(n, 1000)
+        if not thousands:
+            return self.below_thousand[n]
+        return ('ein' if thousands == 1 else self.below_thousand[thousands]) + 'tausend' \
+            + (self.below_thousand[rest] if rest else '')
+
+    def cardinal_float(self, value):
+        """
+        same decomposition as num2words: integer part (truncated), "Komma" and every decimal digit of repr(value)
+
+        :param value: finite float, not integral, with abs(value) < MAX_VALUE and repr(value) without exponent
+        :return: cardinal number words
+        """
+        rstring = repr(value)
+        precision = len(rstring) - rstring.index('.') - 1
+        pre = int(value)
+        post = abs(value - pre) * 10 ** precision
+        if abs(round(post) - post) < 0.01:
+            post = int(round(post))
+        else:
+            post = int(math.floor(post))
+        post = str(post)
+        post = '0' * (precision - len(post)) + post
+        return ' '.join([self.cardinal(pre), 'Komma'] + [self.LOW[int(post[i])] for i in range(precision)])
+
+    def ordinal(self, n):
+        """
+        :param n: int with 0 <= n < MAX_VALUE
+        :return: ordinal number word
+        """
+        word = self.cardinal(n)
+        for ending, replacement in self.ORDINAL_ENDINGS:
+            if word.endswith(ending):
+                word = word[:-len(ending)] + replacement
+                break
+        word += 'te'
+        # "hundertste" is preferred over "einhundertste" (same for "tausendste")
+        if word == 'eintausendste' or word == 'einhundertste':
+            word = word[3:]
+        return word
+
+    def year(self, n):
+        """
+        :param n: int with 0 <= n < MAX_VALUE
+        :return: year in words (e.g. "neunzehnhundertneunundneunzig", but "zweitausendeins")
+        """
+        hundreds, rest = divmod(n, 100)
+        if not hundreds % 10:
+            return self.cardinal(n)
+        return self.cardinal(hundreds) + 'hundert' + (self.cardinal(rest) if rest else '')
+
+    def spell(self, value, to):
+        """
+        :param value: number as passed to num2words
+        :param to: conversion mode of num2words
+        :return: same as num2words(value, lang='de', to=to) or None if not covered (num2words has to be used)
+        """
+        value_type = type(value)
+        if to == 'cardinal':
+            if value_type is int:
+                if -self.MAX_VALUE < value < self.MAX_VALUE:
+                    return self.cardinal(value)
+            elif value_type is float and -self.MAX_VALUE < value < self.MAX_VALUE:
+                if int(value) == value:
+                    return self.cardinal(int(value))
+                if 'e' not in repr(value):
+                    return self.cardinal_float(value)
+        elif (to == 'ordinal' or to == 'year') and value_type is str and self.DETECT_DIGITS.match(value):
+            n = int(value[:-1] if value.endswith('.') else value)
+            if n < self.MAX_VALUE:
+                return self.ordinal(n) if to == 'ordinal' else self.year(n)
+        return None
+
+
+# speller used before num2words (see NumberWordsCache)
+NUMBER_SPELLER = GermanNumberSpeller()
+
+
+class NumberWordsCache:
+    """
+    Size-bounded LRU memo in front of GermanNumberSpeller/num2words(lang='de'), keyed by (value incl. its type, to= mode); one instance
+    (NUMBER_WORDS) is shared by all GermanTransliterate instances of a process
+    """
+
+    def __init__(self, max_size=65536):
+        """
+        Constructor
+
+        :param max_size: maximum number of memoized conversions
+        """
+        self.max_size = max_size
+        # typed: e.g. 1 (int) and 1.0 (float) are converted differently
+        self._lookup = functools.lru_cache(maxsize=max_size, typed=True)(self._convert)
+
+    @staticmethod
+    def _convert(value, to):
+        words = NUMBER_SPELLER.spell(value, to)
+        return words if words is not None else num2words(value, lang='de', to=to)
+
+    def __call__(self, value, to='cardinal'):
+        """
+        :param value: number (int, float or str as accepted by num2words)
+        :param to: conversion mode of num2words ('cardinal', 'ordinal', 'year', ...)
+        :return: same as num2words(value, lang='de', to=to)
+        """
+        return self._lookup(value, to)
+
+    def prewarm(self, cardinals=range(0, 10001), years=range(1900, 2101), ordinals=range(1, 32)):
+        """
+        Converts common numbers in advance, in the forms used by GermanTransliterate: cardinals as int, years and
+        ordinals as str (ordinals also with trailing '.')
+
+        :param cardinals: integers to be memoized as cardinals
+        :param years: years to be memoized
+        :param ordinals: days/ordinals to be memoized
+        """
+        for number in cardinals:
+            self(number, 'cardinal')
+        for year in years:
+            self(str(year), 'year')
+        for number in ordinals:
+            self(str(number), 'ordinal')
+            self(str(number) + '.', 'ordinal')
+
+    def clear(self):
+        self._lookup.cache_clear()
+
+    def stats(self):
+        """
+        :return: dict with hit/miss counters and the number of memoized conversions
+        """
+        info = self._lookup.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_ratio': info.hits / lookups if lookups else None,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+        }
+
+
+# memo of all num2words calls (see NumberWordsCache)
+NUMBER_WORDS = NumberWordsCache()
+
+
+class TransliterationMemo:
+    """
+    LRU memo of transliterated sentences, bounded by the (approximate) size of the memoized texts in bytes; keys contain
+    the effective config of the transliterator (see GermanTransliterate.memo_key), so one instance can be shared by
+    several GermanTransliterate instances (parameter memo) and also across threads
+    """
+
+    def __init__(self, max_bytes=16 * 2 ** 20):
+        """
+        Constructor
+
+        :param max_bytes: maximum size of the memoized input and output texts
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._items = collections.OrderedDict()
+
+    def get(self, key):
+        """
+        :param key: (memo key of the transliterator, sentence)
+        :return: transliterated sentence or None if not memoized
+        """
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._items.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        :param key: (memo key of the transliterator, sentence)
+        :param value: transliterated sentence
+        """
+        size = sys.getsizeof(key[1]) + sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return
+            self._items[key] = value
+            self.size += size
+            while self.size > self.max_bytes:
+                (_, sentence), evicted = self._items.popitem(last=False)
+                self.size -= sys.getsizeof(sentence) + sys.getsizeof(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        :return: dict with hit/miss counters (per sentence) and memory usage
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else None,
+            'evictions': self.evictions,
+            'items': len(self._items),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+        }
+
+
+class GTSpanTracer:
+    """
+    Simple tracer collecting (name, duration in seconds, attributes) of the most recent `window` spans, see parameter
+    tracer of GermanTransliterate; any object with a method span(name, **attributes) returning a context manager can
+    be used instead (e.g. for forwarding spans to a tracing backend)
+    """
+
+    def __init__(self, callback=None, window=10000):
+        """
+        Constructor
+
+        :param callback: if given, called with (name, duration, attributes) for every finished span instead of collecting it in self.spans
+        :param window: number of most recent spans kept in self.spans (bounded memory for long-lived instances), None keeps all
+        """
+        self.callback = callback
+        self.spans = collections.deque(maxlen=window)
+
+    def span(self, name, **attributes):
+        return _GTSpan(self, name, attributes)
+
+    def emit(self, name, duration, attributes):
+        if self.callback:
+            self.callback(name, duration, attributes)
+        else:
+            self.spans.append((name, duration, attributes))
+
+
+class _GTSpan:
+    __slots__ = ('tracer', 'name', 'attributes', 'started_at')
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.emit(self.name, time.perf_counter() - self.started_at, self.attributes)
+        return False
+
+
+class _SpokenSymbolBalance:
+    """
+    Running balance of the spoken symbols in a sequence of words (see GermanTransliterate._spoken_symbol_op): a word
+    with an opening symbol replaces the closing symbol in the next word containing it (unless the word contains the
+    closing symbol itself, quotes always search since opening and closing symbol are the same)
+    """
+
+    __slots__ = ('pairs', 'waiting', 'openers', 'closers_after')
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+        # exact: number of words still searching for their closing symbol
+        self.waiting = [0] * len(pairs)
+        # robust (see closed): words with an opening symbol and words with a closing symbol after the last of them
+        self.openers = [0] * len(pairs)
+        self.closers_after = [0] * len(pairs)
+
+    def add(self, word):
+        for i, (opener, closer) in enumerate(self.pairs):
+            has_opener = opener in word
+            has_closer = closer in word
+            if has_closer and self.waiting[i]:
+                # replaced by a word before, a remaining opening symbol searches again
+                self.waiting[i] -= 1
+                if has_opener and opener != closer:
+                    self.waiting[i] += 1
+            elif has_opener and (opener == closer or not has_closer):
+                self.waiting[i] += 1
+
+            if has_opener:
+                self.openers[i] += 1
+                self.closers_after[i] = 0
+            elif has_closer:
+                self.closers_after[i] += 1
+
+    def closed(self, exact):
+        """
+        :param exact: True if the words are the words of split_text (in _transliterate) and their positions, i.e. no
+                      full-text op changes the words and there are no empty words (see GermanTransliterate._sentences)
+        :return: True if no word searches for a closing symbol after the words; if not exact, the search may start at
+                 an earlier word, thus every word with an opening symbol is assumed to search
+        """
+        if exact:
+            return not any(self.waiting)
+        return all(closers_after >= openers for openers, closers_after in zip(self.openers, self.closers_after))
+
+
 class GermanTransliterate:
     """
     Transliterates *German* text into a normalized form as given by transliter_ops parameter config
@@ -444,7 +825,10 @@ class GermanTransliterate:
                                     'time_of_day', 'ordinal', 'special', 'spoken_symbol'],
                  replace={'-': ' '},
                  sep_abbreviation=' ',
-                 make_lowercase=True
+                 make_lowercase=True,
+                 tracer=None,
+                 engine='sequential',
+                 memo=None
                  ):
         """
         Constructor
@@ -461,39 +845,40 @@ class GermanTransliterate:
         :param replace: dict of "original: replacement" string tuples to be used as additional plain and simple "on-the-fly" replacements with the text, e.g replace={'-' : ' '} replaces all dashes with whitespace
         :param sep_abbreviation: a special separator used for transliteration of abbreviations; this is mostly only useful with phonemic encoding of a text as a next step in a TTS pipeline
         :param make_lowercase: if True, text is made lowercase (default), NOTE: most of the transliterate operations do *only* work with make_lowercase=True - this is due to the various dictionaries operating with lowercase only. Please use make_lowercase=False *only* when transliterate_ops aren't overly used, otherwise most of them do not work!
+        :param tracer: optional tracer (e.g. GTSpanTracer) which gets a timed span for transliterate and every single op (with the input size as attribute "size"); without tracer, no instrumentation is in place at all
+        :param engine: 'sequential' (default) runs every word op on every word, 'prefilter' passes words without any trigger of the enabled ops through untouched (same output, both share the word loop _scan_words and the full-text ops, see ENGINES)
+        :param memo: optional TransliterationMemo (opt-in, may be shared): texts are split into sentences which are transliterated independently of each other where this gives the same output, repeated sentences are served from the memo (see _sentences)
         """
         try:
+            if engine not in self.ENGINES:
+                raise ValueError('Unknown engine: ' + str(engine) + ' (expected one of ' + ', '.join(self.ENGINES) + ')')
+            self.engine = engine
             self.transliterate_ops = transliterate_ops
             self.replace = replace
             self.sep_abbreviation = sep_abbreviation
             self.make_lowercase = make_lowercase
+            self.memo = memo
+            # effective config, part of the keys of memo (engines give the same output)
+            self.memo_key = (tuple(transliterate_ops), tuple(replace.items()), sep_abbreviation, make_lowercase)
+
+            # the configs, compiled regexes and lookup indexes do not depend on the constructor parameters: they are
+            # built by the first instance of a class and shared by all further ones (see SHARED_ATTRIBUTES)
+            shared = self._shared.get(type(self))
+            if shared is None:
+                self._build_shared()
+                shared = {name: getattr(self, name) for name in self.SHARED_ATTRIBUTES}
+                self._shared[type(self)] = shared
+            else:
+                self.__dict__.update(shared)
+
+            self.tracer = tracer
+            if tracer is not None:
+                self._trace_ops()
 
-            # config instantiations
-            self.generic_config = GenericReplacementConfig()
-            self.acronym_phoneme_config = AcronymPhonemeConfig()
-            self.unit_config = UnitConfig()
-            self.abbreviation_config = AbbreviationConfig()
-            self.regex = RegExConfig(self.generic_config,
-                                     self.acronym_phoneme_config,
-                                     self.unit_config,
-                                     self.abbreviation_config)
-
-            # prepare and configure static strings with regular expressions (depending on input config parameters)
-            escaped_cursym = [re.escape(it) for it in self.abbreviation_config.CURRENCY_SYMBOL.keys()]
-            rstring_cursym_escaped = '|'.join(escaped_cursym).replace('_', self.generic_config.SEP_MASK)
-            rstring_curmagn = '|'.join(self.regex.CURRENCY_MAGNITUDE)
-            self.regex.DETECT_CURRENCY_SYMBOL = re.compile(rstring_cursym_escaped)
-            self.regex.DETECT_CURRENCY_MAGNITUDE = re.compile(rstring_curmagn)
-
-            cur_str = '(^|(?<=[\.!?;:\-\(\)\[\]\s]))(([\+\-]{0,1}\d+[\d\.,]*\s*(' \
-                        + rstring_curmagn + '){0,1}\s*' + '(' \
-                        + rstring_cursym_escaped + '))|' + '((' \
-                        + rstring_cursym_escaped + ')\s*[\+\-]{0,1}\d+[\d\.,]*\s*(' \
-                        + rstring_curmagn + '){0,1})|' + '(' \
-                        + rstring_cursym_escaped \
-                        + '))($|(?=[\.!?;:\-\(\)\[\]\s]+))'
-
-            self.regex.DETECT_CURRENCY = re.compile(cur_str)
+            # word ops and the trigger of engine 'prefilter' (resolved after tracing, so traced ops are used as well)
+            # (the trigger depends on transliterate_ops and replace, its compiled regex is cached by module re)
+            self.word_ops = self._build_word_ops()
+            self.word_trigger = self._build_word_trigger()
 
         except Exception as e:
             print('', file=sys.stderr)
@@ -503,27 +888,272 @@ class GermanTransliterate:
             print('', file=sys.stderr)
             raise e
 
+    # instance attributes shared by all instances of a class (see constructor)
+    SHARED_ATTRIBUTES = ('generic_config', 'acronym_phoneme_config', 'unit_config', 'abbreviation_config', 'regex',
+                         'accent_peculiarity_table', 'misc_abbreviation_index', 'unit_index', 'attached_unit_index',
+                         'acronym_mask_memo', 'acronym_phoneme_memo', 'feature_characters')
+    _shared = {}
+
+    def _build_shared(self):
+        """
+        build the configs, compiled regexes and lookup indexes listed in SHARED_ATTRIBUTES (once per class)
+        """
+
+        # config instantiations
+        self.generic_config = GenericReplacementConfig()
+        self.acronym_phoneme_config = AcronymPhonemeConfig()
+        self.unit_config = UnitConfig()
+        self.abbreviation_config = AbbreviationConfig()
+        self.regex = RegExConfig(self.generic_config,
+                                 self.acronym_phoneme_config,
+                                 self.unit_config,
+                                 self.abbreviation_config)
+
+        # prepare and configure static strings with regular expressions (currency symbols and magnitudes)
+        escaped_cursym = [re.escape(it) for it in self.abbreviation_config.CURRENCY_SYMBOL.keys()]
+        rstring_cursym_escaped = '|'.join(escaped_cursym).replace('_', self.generic_config.SEP_MASK)
+        rstring_curmagn = '|'.join(self.regex.CURRENCY_MAGNITUDE)
+        self.regex.DETECT_CURRENCY_SYMBOL = re.compile(rstring_cursym_escaped)
+        self.regex.DETECT_CURRENCY_MAGNITUDE = re.compile(rstring_curmagn)
+
+        cur_str = '(^|(?<=[\.!?;:\-\(\)\[\]\s]))(([\+\-]{0,1}\d+[\d\.,]*\s*(' \
+                    + rstring_curmagn + '){0,1}\s*' + '(' \
+                    + rstring_cursym_escaped + '))|' + '((' \
+                    + rstring_cursym_escaped + ')\s*[\+\-]{0,1}\d+[\d\.,]*\s*(' \
+                    + rstring_curmagn + '){0,1})|' + '(' \
+                    + rstring_cursym_escaped \
+                    + '))($|(?=[\.!?;:\-\(\)\[\]\s]+))'
+
+        self.regex.DETECT_CURRENCY = re.compile(cur_str)
+
+        # single-pass character translation table for transliterate_op "accent_peculiarity"
+        # (invariant: no mapped character is itself a key, so one pass equals the former sequential replacements)
+        self.accent_peculiarity_table = str.maketrans({
+            c: mapped for chars, mapped in self.generic_config.UNICODE_TO_ASCII.items() for c in chars
+        })
+        # prefilter, e.g. regular German text (umlauts, ß) contains none of these characters
+        self.regex.DETECT_ACCENT_PECULIARITY = re.compile(
+            '[' + re.escape(''.join(self.generic_config.UNICODE_TO_ASCII.keys())) + ']')
+
+        # memos of acronym expansions (see _expand_acronym)
+        self.acronym_mask_memo = {}
+        self.acronym_phoneme_memo = {}
+
+        # trigger characters of the features of a text (see _profile), currency symbols are either masked acronyms
+        # (containing SEP_MASK) or contain one of their non-letter characters
+        currency_characters = set(self.generic_config.SEP_MASK)
+        for symbol in self.abbreviation_config.CURRENCY_SYMBOL.keys():
+            currency_characters.update(c for c in symbol if not c.isalpha() and c != '_')
+        self.feature_characters = {
+            'currency': frozenset(currency_characters),
+            'spoken_symbol': frozenset(pats[0] for pats in self.abbreviation_config.SPOKEN_SYMBOL.keys()),
+        }
+
+        # lookup indexes for the word loop (see _misc_abbreviation_op and _number_unit_op)
+        self.misc_abbreviation_index = self._build_misc_abbreviation_index()
+        self.unit_index = self._build_unit_index(mask_separator=True)
+        self.attached_unit_index = self._build_unit_index(mask_separator=False)
+
+    # engines of the word loop (see parameter engine in constructor)
+    ENGINES = ('sequential', 'prefilter')
+
+    # methods instrumented with a tracer (see parameter tracer in constructor)
+    TRACED_OPS = ('transliterate', '_transliterate', '_mask_acronym', '_acronym_phoneme_op',
+                  '_accent_peculiarity_op', '_amount_money_op', '_date_op', '_timestamp_op', '_timeofday_op',
+                  '_weekday_op', '_month_op', '_ordinal_op', '_special_op', '_math_symbol_op', '_spoken_symbol_op',
+                  '_misc_abbreviation_op', '_number_unit_op', '_transliterate_number')
+
+    def _trace_ops(self):
+        """
+        replace the ops listed in TRACED_OPS on this instance by wrappers emitting a span per call
+        (done once in the constructor, so instances without tracer run the plain methods)
+        """
+
+        def traced(name, op):
+            def wrapper(text, *args):
+                with self.tracer.span(name, size=len(text)):
+                    return op(text, *args)
+            return wrapper
+
+        for name in self.TRACED_OPS:
+            setattr(self, name, traced(name.strip('_'), getattr(self, name)))
+
+    # calling conventions of the word ops (see _scan_words)
+    WORD_OP_PLAIN, WORD_OP_ORDINAL, WORD_OP_SPOKEN_SYMBOL = range(3)
+
+    def _build_word_ops(self):
+        """
+        resolve the word ops of transliterate_ops once (in their configured order) for the word loop (see _scan_words)
+
+        NOTE: because of the kind of split, op "special" only covers statements/terms with a single word (e.g. "8/10"
+              but not "8 / 10")
+
+        :return: list of (bound op, calling convention)
+        """
+
+        word_ops = []
+        for tr in self.transliterate_ops:
+            if tr in ('weekday', 'month', 'special', 'math_symbol'):
+                word_ops.append((getattr(self, '_' + tr + '_op'), self.WORD_OP_PLAIN))
+            elif tr == 'ordinal':
+                word_ops.append((self._ordinal_op, self.WORD_OP_ORDINAL))
+            elif tr == 'spoken_symbol':
+                word_ops.append((self._spoken_symbol_op, self.WORD_OP_SPOKEN_SYMBOL))
+        return word_ops
+
+    def _build_word_trigger(self):
+        """
+        build the regex detecting words which any of the word ops (incl. replace and numbers) may change; a word
+        without match is left as it is by all of them - except for the index lookups of misc abbreviations and units,
+        which are checked separately
+
+        :return: compiled regex
+        """
+
+        rstrings = ['\\d']
+        if 'weekday' in self.transliterate_ops:
+            rstrings.append(self.regex.DETECT_WEEKDAY.pattern)
+        if 'month' in self.transliterate_ops:
+            rstrings.append(self.regex.DETECT_MONTH.pattern)
+        if 'special' in self.transliterate_ops:
+            rstrings.append(self.regex.DETECT_SPECIAL_TRIGGER.pattern)
+        if 'math_symbol' in self.transliterate_ops:
+            rstrings += [re.escape(pat) for pat in self.abbreviation_config.MATH_SYMBOL.keys()]
+        if 'spoken_symbol' in self.transliterate_ops:
+            rstrings += [re.escape(pats[0]) for pats in self.abbreviation_config.SPOKEN_SYMBOL.keys()]
+        # NOTE: an empty key matches every word, i.e. no word is passed through
+        rstrings += [re.escape(old) for old in self.replace.keys()]
+        return re.compile('|'.join(rstrings))
+
+    # forms of "one" preceding a unit which require the singular form of the unit
+    ONE_FORMS = ('eins', 'ein', 'eine', 'einer', 'einen', 'einem')
+
+    # features of a text (see _profile) required by the full-text ops, an op is skipped if the text has none of them
+    # (invariant: no op introduces a feature which the text did not have before, except _mask_acronym, which turns
+    # acronyms into currency symbols, thus "uppercase_run" is required alternatively for _amount_money_op)
+    OP_FEATURES = {
+        '_mask_acronym': ('uppercase_run',),
+        '_amount_money_op': ('currency', 'uppercase_run'),
+        '_date_op': ('digit',),
+        '_timestamp_op': ('digit',),
+        '_timeofday_op': ('digit',),
+        '_index_spoken_symbol_closers': ('spoken_symbol',),
+    }
+
+    def _profile(self, text):
+        """
+        cheap profile of a text (one pass over its characters plus two regex searches) as set of the features listed
+        in OP_FEATURES: "digit" (any decimal digit), "uppercase_run" (a possible acronym), "currency" (any character of
+        a currency symbol) and "spoken_symbol" (any opening symbol of SPOKEN_SYMBOL)
+
+        :param text: full text
+        :return: set of features
+        """
+
+        characters = set(text)
+        features = {feature for feature, trigger in self.feature_characters.items()
+                    if not trigger.isdisjoint(characters)}
+        if self.regex.DETECT_DIGIT.search(text):
+            features.add('digit')
+        if self.regex.DETECT_UPPERCASE_RUN.search(text):
+            features.add('uppercase_run')
+        return features
+
+    def _applicable(self, op_name, features):
+        """
+        :param op_name: name of a full-text op (key of OP_FEATURES)
+        :param features: profile of the text (see _profile)
+        :return: False if the op cannot change the text (none of its required features present)
+        """
+
+        return not features.isdisjoint(self.OP_FEATURES[op_name])
+
+    def _build_misc_abbreviation_index(self):
+        """
+        build the word -> replacement index of AbbreviationConfig.MISC (abbreviations with and without trailing '.');
+        the replacement of every indexed word is computed with the sequential scan over MISC, thus the index is
+        exactly equivalent to it
+
+        :return: dict of word -> replacement
+        """
+
+        index = {}
+        for short in self.abbreviation_config.MISC.keys():
+            for word in (short, short + '.'):
+                replaced = word
+                for _short, _long in self.abbreviation_config.MISC.items():
+                    if _long not in replaced:
+                        if (_short + '.') == replaced or _short == replaced:
+                            replaced = _long
+                if replaced != word:
+                    index[word] = replaced
+        return index
+
+    def _build_unit_index(self, mask_separator):
+        """
+        build the word -> (unit, plural suffix length) index of UnitConfig; the lookup precedence of the former probes
+        is kept (PLURAL_NO_SUFFIX before PLURAL_SUFFIX_EN before PLURAL_SUFFIX_N), the plural suffix length is
+        0, 2 ('en') or 1 ('n') respectively
+
+        :param mask_separator: if True, keys are also indexed with each '_' replaced by SEP_MASK (units separated from numbers)
+        :return: dict of word (also with trailing '.') -> (unit, plural suffix length)
+        """
+
+        index = {}
+        for units, suffix_len in ((self.unit_config.PLURAL_SUFFIX_N, 1),
+                                  (self.unit_config.PLURAL_SUFFIX_EN, 2),
+                                  (self.unit_config.PLURAL_NO_SUFFIX, 0)):
+            for short, long in units.items():
+                variants = [short]
+                if mask_separator:
+                    for _ in range(short.count('_')):
+                        variants += [v.replace('_', self.generic_config.SEP_MASK, 1) for v in variants]
+                for variant in variants:
+                    index[variant] = (long, suffix_len)
+                    index[variant + '.'] = (long, suffix_len)
+        return index
+
+    # maximum number of memoized expansions per kind (the memo is cleared when full)
+    MAX_ACRONYM_MEMO = 4096
+
+    def _expand_acronym(self, acronym, phonemes):
+        """
+        expansion of a single acronym (memoized): its letters (without '.') joined by self.generic_config.SEP_MASK,
+        either as they are or as phonemes of AcronymPhonemeConfig.LETTER; excluded acronyms stay as they are
+
+        :param acronym: acronym as matched by DETECT_ABBREVIATION
+        :param phonemes: if True, letters are expanded to phonemes
+        :return: expanded acronym
+        """
+
+        memo = self.acronym_phoneme_memo if phonemes else self.acronym_mask_memo
+        expanded = memo.get(acronym)
+        if expanded is None:
+            if acronym in self.acronym_phoneme_config.EXCLUDE:
+                expanded = acronym
+            elif phonemes:
+                expanded = self.generic_config.SEP_MASK.join([self.acronym_phoneme_config.LETTER[c]
+                                                              for c in acronym.replace('.', '')])
+            else:
+                expanded = self.generic_config.SEP_MASK.join(acronym.replace('.', ''))
+            if len(memo) >= self.MAX_ACRONYM_MEMO:
+                memo.clear()
+            memo[acronym] = expanded
+        return expanded
+
     def _mask_acronym(self, text):
         """
         mask between each letter of an acronym with separator self.generic_config.SEP_MASK
         in order to be able to find/process those acronyms later on
 
+        single pass over the text, every acronym is replaced at its own position
+
         :param text: text to be scanned for acronyms
         :return: processed text
         """
 
         try:
-            abbr_expanded = []
-            for abbr in self.regex.DETECT_ABBREVIATION.finditer(text):
-                if abbr.group(0) not in self.acronym_phoneme_config.EXCLUDE:
-                    abbr_expanded.append(
-                        (abbr.group(0), self.generic_config.SEP_MASK.join([c for c in
-                            abbr.group(0).replace('.', '')
-                        ])))
-            for m in abbr_expanded:
-                text = text.replace(m[0], m[1], 1)
-
-            return text
+            return self.regex.DETECT_ABBREVIATION.sub(lambda abbr: self._expand_acronym(abbr.group(0), False), text)
         except Exception as e:
             print('', file=sys.stderr)
             print('*** An exception occurred in section', sys._getframe().f_code.co_name,
@@ -536,23 +1166,14 @@ class GermanTransliterate:
         """
         TRANSLITERATE ABBREVIATONS (WITH ONLY CAPITAL LETTERS)
 
+        single pass over the text, every acronym is replaced at its own position
+
         :param text: text to be scanned for acronyms
         :return: processed text
         """
 
         try:
-            abbr_expanded = []
-            for abbr in self.regex.DETECT_ABBREVIATION.finditer(text):
-                if abbr.group(0) not in self.acronym_phoneme_config.EXCLUDE:
-                    abbr_expanded.append(
-                        (abbr.group(0), self.generic_config.SEP_MASK.join([
-                            self.acronym_phoneme_config.LETTER[c] for c in
-                            abbr.group(0).replace('.', '')
-                        ])))
-            for m in abbr_expanded:
-                text = text.replace(m[0], m[1], 1)
-
-            return text
+            return self.regex.DETECT_ABBREVIATION.sub(lambda abbr: self._expand_acronym(abbr.group(0), True), text)
         except Exception as e:
             print('', file=sys.stderr)
             print('*** An exception occurred in section', sys._getframe().f_code.co_name,
@@ -570,10 +1191,11 @@ class GermanTransliterate:
         """
 
         try:
-            for chars, mapped in self.generic_config.UNICODE_TO_ASCII.items():
-                text = re.sub('|'.join([c for c in chars]), mapped, text)
+            # fast path: all keys of UNICODE_TO_ASCII are non-ASCII characters
+            if text.isascii() or not self.regex.DETECT_ACCENT_PECULIARITY.search(text):
+                return text
 
-            return text
+            return text.translate(self.accent_peculiarity_table)
         except Exception as e:
             print('', file=sys.stderr)
             print('*** An exception occurred in section', sys._getframe().f_code.co_name,
@@ -590,7 +1212,9 @@ class GermanTransliterate:
         :return: processed text
         """
         try:
-            diff_len = 0
+            # the text is rebuilt once from the unchanged spans between the matches and the rearranged terms
+            parts = []
+            last_end = 0
             for mc in self.regex.DETECT_CURRENCY.finditer(text):
 
                 match_currency = self._acronym_phoneme_op(mc.group(0))
@@ -619,10 +1243,14 @@ class GermanTransliterate:
                     rearranged_currency_term += m_magnitude.group(0) + ' ' if m_magnitude else ''
                     rearranged_currency_term += self.abbreviation_config.CURRENCY_SYMBOL[
                         m_symbol.group(0).replace(self.generic_config.SEP_MASK, '_')]
-                text = text[:mc.start() + diff_len] + rearranged_currency_term + text[mc_end + diff_len:]
-                diff_len = len(rearranged_currency_term) - (mc_end - (mc.start() + diff_len))
-
-            return text
+                parts.append(text[last_end:mc.start()])
+                parts.append(rearranged_currency_term)
+                last_end = mc_end
+
+            if not parts:
+                return text
+            parts.append(text[last_end:])
+            return ''.join(parts)
         except Exception as e:
             print('', file=sys.stderr)
             print('*** An exception occurred in section', sys._getframe().f_code.co_name,
@@ -640,13 +1268,14 @@ class GermanTransliterate:
         """
 
         try:
-            for date_m in self.regex.DETECT_DATE.finditer(text):
+            # one pass over the text: every match is replaced via callback (offsets refer to the input text)
+            def transliterate_date(date_m):
                 frags = date_m.group(0).split('.')
                 if ' ' in frags[-1]:
                     space_split = frags[-1].strip().split(' ')
                     del (frags[-1])
                     frags.extend(space_split)
-                day = num2words(frags[0], lang='de', to='ordinal')
+                day = NUMBER_WORDS(frags[0], 'ordinal')
                 if date_m.start() > 1 and text[date_m.start() - 2:date_m.start()] in ('m ', 'n '):
                     day += 'n'
                 if frags[1].strip() in self.abbreviation_config.MONTH:
@@ -655,10 +1284,10 @@ class GermanTransliterate:
                     month = self.abbreviation_config.NUMBER_MONTH[frags[1].strip()]
                 year = ''
                 if len(frags) == 3 and frags[2]:
-                    year = num2words(frags[2], lang='de', to='year')
-                text = self.regex.DETECT_DATE.sub(day + ' ' + month + (' ' + year if year else ''), text, count=1)
+                    year = NUMBER_WORDS(frags[2], 'year')
+                return day + ' ' + month + (' ' + year if year else '')
 
-            return text
+            return self.regex.DETECT_DATE.sub(transliterate_date, text)
         except Exception as e:
             print('', file=sys.stderr)
             print('*** An exception occurred in section', sys._getframe().f_code.co_name,
@@ -676,7 +1305,8 @@ class GermanTransliterate:
         """
 
         try:
-            for timestamp_m in self.regex.DETECT_TIMESTAMP.finditer(text):
+            # one pass over the text: every match is replaced via callback
+            def transliterate_timestamp(timestamp_m):
                 ts = timestamp_m.group(0)
                 ts_split = ts.split(':')
                 if len(ts_split) == 2:
@@ -702,10 +1332,9 @@ class GermanTransliterate:
                         ts += 'eine sekunde'
                     else:
                         ts += ts_split[2].replace('sek', '').replace('sec', '').replace('s', '') + ' sekunden'
+                return ts
 
-                text = text[:timestamp_m.start()] + ts + text[timestamp_m.end():]
-
-            return text
+            return self.regex.DETECT_TIMESTAMP.sub(transliterate_timestamp, text)
         except Exception as e:
             print('', file=sys.stderr)
             print('*** An exception occurred in section', sys._getframe().f_code.co_name,
@@ -724,15 +1353,14 @@ class GermanTransliterate:
 
         try:
             # TODO: cover also other ways of transliterating time of day (e.g. 07.45h as "dreiviertel acht")
-            for time_m in self.regex.DETECT_TIME_OF_DAY.finditer(text):
-                tod = text[time_m.start():time_m.end()].replace('uhr', '').replace('h', '').replace(':',
-                                                                                                    ' uhr ').replace(
-                    '.', ' uhr ')
+            # one pass over the text: every match is replaced via callback
+            def transliterate_timeofday(time_m):
+                tod = time_m.group(0).replace('uhr', '').replace('h', '').replace(':', ' uhr ').replace('.', ' uhr ')
                 if int(tod.split(' uhr ')[0]) == 1:
                     tod = 'ein uhr ' + tod.split(' uhr ')[1]
-                text = text[:time_m.start()] + tod + text[time_m.end():]
+                return tod
 
-            return text
+            return self.regex.DETECT_TIME_OF_DAY.sub(transliterate_timeofday, text)
         except Exception as e:
             print('', file=sys.stderr)
             print('*** An exception occurred in section', sys._getframe().f_code.co_name,
@@ -814,7 +1442,7 @@ class GermanTransliterate:
             if self.regex.DETECT_ORDINAL.match(word) and word.endswith('.'):
                 if idx < (len(split_text) - 1) \
                         and split_text[idx + 1] not in self.abbreviation_config.CURRENCY_SYMBOL.values():
-                    word = num2words(word, lang='de', to='ordinal')
+                    word = NUMBER_WORDS(word, 'ordinal')
                     if idx > 0 and idx < (len(split_text) - 1):
                         if cleaned[idx - 1].endswith('m'):
                             word += 'n'
@@ -837,8 +1465,18 @@ class GermanTransliterate:
         :return:
         """
         try:
-            for pat, tup_repl in self.regex.SPECIAL_TRANSLITERATE.items():
-                if re.search(pat, word):
+            # prefilter: plain words do not contain any trigger character and can never match
+            triggers = self.regex.DETECT_SPECIAL_TRIGGER.findall(word)
+            if not triggers:
+                return word
+
+            candidates = set()
+            for c in triggers:
+                candidates.update(self.regex.SPECIAL_TRANSLITERATE_TRIGGER[c])
+
+            for idx in sorted(candidates):
+                pat, tup_repl = self.regex.SPECIAL_TRANSLITERATE_COMPILED[idx]
+                if tup_repl[0] in word and pat.search(word):
                     word = word.replace(tup_repl[0], tup_repl[1], 1)
                     ws = []
                     for w in word.split(' '):
@@ -893,7 +1531,23 @@ class GermanTransliterate:
             print('', file=sys.stderr)
             raise e
 
-    def _spoken_symbol_op(self, word, idx, split_text):
+    def _index_spoken_symbol_closers(self, text, split_text):
+        """
+        index the positions of the words containing a closing symbol, for every SPOKEN_SYMBOL pair whose opening symbol
+        occurs in the text at all (a single pass over the words before the word loop, see _spoken_symbol_op)
+
+        :param text: full text (split into split_text)
+        :param split_text: list of words (split from full text)
+        :return: dict of symbol pair -> [positions of the words containing the closing symbol, cursor]
+        """
+
+        closers = {}
+        for pats in self.abbreviation_config.SPOKEN_SYMBOL.keys():
+            if pats[0] in text:
+                closers[pats] = [[pos for pos, word in enumerate(split_text) if pats[1] in word], 0]
+        return closers
+
+    def _spoken_symbol_op(self, word, idx, split_text, closers=None):
         """
         TRANSLITERATE SPOKEN SYMBOLS (e.g. transliterate brackets into "in Klammern"),
         mainly useful for TTS tasks (or ASR preprocessing for trainings)
@@ -901,6 +1555,7 @@ class GermanTransliterate:
         :param word: single word to be scanned for spoken symbols
         :param idx: current word index in the list of words (split from full text)
         :param split_text: list of words (where parameter word is part of)
+        :param closers: optional index of the closing symbols (see _index_spoken_symbol_closers), otherwise split_text is scanned forward for the closing symbol
         :return: processed word
         """
 
@@ -910,6 +1565,18 @@ class GermanTransliterate:
                     word = word.replace(pats[0], repl.replace('_', self.generic_config.SEP_MASK))
                     if pats[1] in word:
                         word = word.replace(pats[1], self.generic_config.SEP_MASK)
+                    elif closers is not None and pats in closers:
+                        # the next word (from idx + 1 on) still containing the closing symbol: idx never decreases
+                        # during the word loop and only the word found loses its closing symbol, thus a cursor over
+                        # the indexed positions finds the same word as the forward scan below
+                        positions, cursor = closers[pats]
+                        while cursor < len(positions) and positions[cursor] <= idx:
+                            cursor += 1
+                        if cursor < len(positions):
+                            fwd_idx = positions[cursor]
+                            split_text[fwd_idx] = split_text[fwd_idx].replace(pats[1], self.generic_config.SEP_MASK)
+                            cursor += 1
+                        closers[pats][1] = cursor
                     else:
                         for fwd_idx in range(idx + 1, len(split_text)):
                             if pats[1] in split_text[fwd_idx]:
@@ -935,13 +1602,8 @@ class GermanTransliterate:
         """
 
         try:
-            for short, long in self.abbreviation_config.MISC.items():
-                if long not in word:
-                    # invariant: cover also abbreviation with '.' at the end
-                    if (short + '.') == word or short == word:
-                        word = long
-
-            return word
+            # invariant: cover also abbreviation with '.' at the end (indexed, too)
+            return self.misc_abbreviation_index.get(word, word)
         except Exception as e:
             print('', file=sys.stderr)
             print('*** An exception occurred in section', sys._getframe().f_code.co_name,
@@ -965,38 +1627,17 @@ class GermanTransliterate:
         # e.g. "t" in conjunction with term "20 t"
 
         try:
-            w_unit = word
             # TODO: remove non-alphanum for mapping to transliterations, e.g. boundary chars like "!" or "?"
-            if w_unit.endswith('.'):
-                w_unit = w_unit[:-1]
-            w_unit = w_unit.replace(self.generic_config.SEP_MASK, '_')
-
-            if w_unit in self.unit_config.PLURAL_NO_SUFFIX.keys():
-                word = self.unit_config.PLURAL_NO_SUFFIX[w_unit]
-                if idx > 0 and cleaned_words[idx - 1] == ('eins'):
-                    cleaned_words[idx - 1] = 'ein'
-            elif w_unit in self.unit_config.PLURAL_SUFFIX_EN.keys():
-                word = self.unit_config.PLURAL_SUFFIX_EN[w_unit]
+            # (trailing '.' and masked separators are covered by the index)
+            unit = self.unit_index.get(word)
+            if unit is not None:
+                word, suffix_len = unit
+                if suffix_len == 0:
+                    if idx > 0 and cleaned_words[idx - 1] == ('eins'):
+                        cleaned_words[idx - 1] = 'ein'
                 # invariant: one <unit>
-                if idx > 0 and (cleaned_words[idx - 1] == ('eins')
-                                or cleaned_words[idx - 1] == ('ein')
-                                or cleaned_words[idx - 1] == ('eine')
-                                or cleaned_words[idx - 1] == ('einer')
-                                or cleaned_words[idx - 1] == ('einen')
-                                or cleaned_words[idx - 1] == ('einem')):
-                    word = word[:-2]
-                    cleaned_words[idx - 1] = 'eine'
-
-            elif w_unit in self.unit_config.PLURAL_SUFFIX_N.keys():
-                word = self.unit_config.PLURAL_SUFFIX_N[w_unit]
-                # invariant: one <unit>
-                if idx > 0 and (cleaned_words[idx - 1] == ('eins')
-                                or cleaned_words[idx - 1] == ('ein')
-                                or cleaned_words[idx - 1] == ('eine')
-                                or cleaned_words[idx - 1] == ('einer')
-                                or cleaned_words[idx - 1] == ('einen')
-                                or cleaned_words[idx - 1] == ('einem')):
-                    word = word[:-1]
+                elif idx > 0 and cleaned_words[idx - 1] in self.ONE_FORMS:
+                    word = word[:-suffix_len]
                     cleaned_words[idx - 1] = 'eine'
 
             # EXPAND (remaining) NUMBERS
@@ -1009,23 +1650,15 @@ class GermanTransliterate:
                 w_unit = word[num_match.end():]
                 invariant_one = False
                 if w_unit:
-                    if w_unit.endswith('.'):
-                        w_unit = w_unit[:-1]
-
-                    if w_unit in self.unit_config.PLURAL_NO_SUFFIX.keys():
-                        w_unit = self.unit_config.PLURAL_NO_SUFFIX[w_unit]
-                    elif w_unit in self.unit_config.PLURAL_SUFFIX_EN.keys():
-                        w_unit = self.unit_config.PLURAL_SUFFIX_EN[w_unit]
-                        # invariant: one <unit>
-                        if num_match.group(0).replace('+', '').replace('-', '') in ['1', '1.0', '1.00']:
-                            w_unit = w_unit[:-2]
-                            invariant_one = True
-                    elif w_unit in self.unit_config.PLURAL_SUFFIX_N.keys():
-                        w_unit = self.unit_config.PLURAL_SUFFIX_N[w_unit]
+                    unit = self.attached_unit_index.get(w_unit)
+                    if unit is not None:
+                        w_unit, suffix_len = unit
                         # invariant: one <unit>
-                        if num_match.group(0).replace('+', '').replace('-', '') in ['1', '1.0', '1.00']:
-                            w_unit = w_unit[:-1]
+                        if suffix_len and num_match.group(0).replace('+', '').replace('-', '') in ['1', '1.0', '1.00']:
+                            w_unit = w_unit[:-suffix_len]
                             invariant_one = True
+                    elif w_unit.endswith('.'):
+                        w_unit = w_unit[:-1]
                     w_unit = ' ' + w_unit
                     word = num_match.group(0)
 
@@ -1044,6 +1677,68 @@ class GermanTransliterate:
             print('', file=sys.stderr)
             raise e
 
+    def _scan_words(self, split_text, closers=None):
+        """
+        WORD LOOP: a single left-to-right pass over the words with the word ops resolved in the constructor (see
+        _build_word_ops); with engine 'prefilter', a word without any trigger (see _build_word_trigger) and not in the
+        abbreviation/unit indexes is emitted as it is, engine 'sequential' runs every word through all ops
+
+        :param split_text: list of words (split from full text), may be changed by op "spoken_symbol"
+        :param closers: index of the closing symbols for op "spoken_symbol" (see _index_spoken_symbol_closers)
+        :return: list of cleaned/normalized/transliterated words
+        """
+
+        try:
+            prefilter = self.engine == 'prefilter'
+            detect_trigger = self.word_trigger.search
+            misc_abbreviation_index = self.misc_abbreviation_index
+            unit_index = self.unit_index
+            replace = self.replace.items()
+
+            # list of cleaned/normalized/transliterated words (as derived from split_text)
+            cleaned_words = []
+            idx = 0
+            for word in split_text:
+                if not word:
+                    continue
+
+                if prefilter and detect_trigger(word) is None \
+                        and word not in misc_abbreviation_index and word not in unit_index:
+                    cleaned_words.append(word)
+                    idx += 1
+                    continue
+
+                # EXPAND CHARACTERS AND TERMS for transliteration (in the order of transliterate_ops)
+                for op, convention in self.word_ops:
+                    if convention == self.WORD_OP_PLAIN:
+                        word = op(word)
+                    elif convention == self.WORD_OP_ORDINAL:
+                        word = op(word, idx, split_text, cleaned_words)
+                    else:
+                        word = op(word, idx, split_text, closers)
+
+                # REPLACE/MAP (remaining) SPECIFIC TERMS/CHARACTERS
+                for old, new in replace:
+                    word = word.replace(old, new)
+
+                # REPLACE/MAP miscellaneous abbreviations or short forms
+                word = self._misc_abbreviation_op(word)
+
+                # TRANSLITERATE NUMBERS in combination with misc. units (both attached and separated units)
+                word = self._number_unit_op(word, idx, cleaned_words)
+
+                cleaned_words.append(word)
+                idx += 1
+
+            return cleaned_words
+        except Exception as e:
+            print('', file=sys.stderr)
+            print('*** An exception occurred in section', sys._getframe().f_code.co_name,
+                  'of class', type(self).__name__, '- see Traceback for details',
+                  file=sys.stderr)
+            print('', file=sys.stderr)
+            raise e
+
     def transliterate(self, text):
         """
         Transliterates any text to a normalized form as given by config (cf. parameter transliterate_ops in constructor)
@@ -1052,6 +1747,163 @@ class GermanTransliterate:
         :return: the normalized form of the given text
         """
 
+        try:
+            if self.memo is None:
+                return self._transliterate(text)
+
+            normalized = []
+            for sentence in self._sentences(text):
+                key = (self.memo_key, sentence)
+                transliterated = self.memo.get(key)
+                if transliterated is None:
+                    transliterated = self._transliterate(sentence)
+                    self.memo.put(key, transliterated)
+                normalized.append(transliterated)
+
+            if len(normalized) == 1:
+                return normalized[0]
+            # whitespace sequences only at the joints (each sentence is normalized already)
+            text = ' '.join(normalized)
+            return self.regex.DETECT_WHITESPACE_SEQ.sub(' ', text) if '  ' in text else text
+        except Exception as e:
+            print('', file=sys.stderr)
+            print('*** An exception occurred in section', sys._getframe().f_code.co_name,
+                  'of class', type(self).__name__, '- see Traceback for details',
+                  file=sys.stderr)
+            print('', file=sys.stderr)
+            raise e
+
+    def _sentences(self, text):
+        """
+        split text into sentences (or groups of them) which are transliterated independently of each other with the
+        same output as the whole text, i.e. the output of the text is the output of its sentences joined by ' '
+
+        a candidate boundary (see RegExConfig.DETECT_SENTENCE_BOUNDARY) is within no match of a full-text op; it is
+        skipped if the word before it is not a plain word or the word after it is a unit (see _number_unit_op), and
+
+          - if a spoken symbol before it may be closed after it (see _SpokenSymbolBalance): the rest of the text is one
+            sentence then
+          - ops "ordinal" and "spoken_symbol" look up split_text[idx + 1], where idx does not count empty words: a
+            sentence with digits (ordinals may also result from full-text ops, e.g. "6:38h.") or spoken symbols is
+            joined with all sentences before it if those may contain empty words (see _may_have_empty_words)
+
+        :param text: full text
+        :return: list of sentences (without the spaces at the boundaries)
+        """
+
+        spans = []
+        start = 0
+        empty_words = False
+        for boundary in self.regex.DETECT_SENTENCE_BOUNDARY.finditer(text):
+            end = boundary.end() - 1
+            if not text[text.rfind(' ', 0, end - 1) + 1:end - 1].isalpha():
+                continue
+            next_end = text.find(' ', end + 1)
+            next_word = text[end + 1:next_end] if next_end >= 0 else text[end + 1:]
+            if next_word in self.unit_index or next_word.lower() in self.unit_index:
+                continue
+
+            sentence = text[start:end]
+            if not self._spoken_symbols_closed(sentence, not empty_words and self._plain_words(sentence)):
+                break
+            empty_words = self._add_sentence(spans, start, end, sentence, empty_words)
+            start = end + 1
+
+        self._add_sentence(spans, start, len(text), text[start:], empty_words)
+        return [text[start:end] for start, end in spans]
+
+    def _add_sentence(self, spans, start, end, sentence, empty_words):
+        """
+        append the span of a sentence, or join it with all spans before (see _sentences)
+
+        :param spans: list of the (start, end) offsets of the sentences so far
+        :param start: offset of the sentence in the full text
+        :param end: end offset of the sentence in the full text
+        :param sentence: the sentence
+        :param empty_words: True if the sentences so far may contain empty words
+        :return: True if the sentences (incl. the new one) may contain empty words
+        """
+
+        if empty_words:
+            if spans and (('ordinal' in self.transliterate_ops and self.regex.DETECT_DIGIT.search(sentence))
+                          or ('spoken_symbol' in self.transliterate_ops
+                              and not self.feature_characters['spoken_symbol'].isdisjoint(sentence))):
+                spans[:] = [(0, end)]
+            else:
+                spans.append((start, end))
+            return True
+
+        spans.append((start, end))
+        return self._may_have_empty_words(sentence)
+
+    def _may_have_empty_words(self, text):
+        """
+        :param text: text (part of a full text)
+        :return: False if split_text of the text contains no empty words for sure: no double or leading spaces and no
+                 match of a full-text op which may add a trailing space (_amount_money_op, e.g. "5,00 €", and
+                 _timeofday_op, e.g. "12:30 uhr"; the replacements of the other ops are separated by single spaces)
+        """
+
+        if '  ' in text or text.startswith(' '):
+            return True
+        features = self._profile(text)
+        if 'amount_money' in self.transliterate_ops and self._applicable('_amount_money_op', features):
+            return True
+        # the ops before do not add matches of DETECT_TIME_OF_DAY, i.e. no match in the text means no match at all
+        return 'time_of_day' in self.transliterate_ops and self._applicable('_timeofday_op', features) \
+            and self.regex.DETECT_TIME_OF_DAY.search(text.lower()) is not None
+
+    def _spoken_symbols_closed(self, text, exact):
+        """
+        :param text: text (part of a full text)
+        :param exact: see _SpokenSymbolBalance.closed (use _plain_words)
+        :return: True if no word of the text may replace a closing spoken symbol after the text
+        """
+
+        if 'spoken_symbol' not in self.transliterate_ops \
+                or self.feature_characters['spoken_symbol'].isdisjoint(text):
+            return True
+        balance = _SpokenSymbolBalance(tuple(self.abbreviation_config.SPOKEN_SYMBOL.keys()))
+        for word in text.split(' '):
+            balance.add(word)
+        return balance.closed(exact)
+
+    def _plain_words(self, text):
+        """
+        :param text: text (part of a full text)
+        :return: True if the words of the text are the words of split_text in _transliterate: no empty words and no
+                 digits (currency symbols without numbers only change words without spoken symbols)
+        """
+
+        return '  ' not in text and not text.startswith(' ') and not self.regex.DETECT_DIGIT.search(text)
+
+    def _stream_boundary(self, word, next_word):
+        """
+        the space between two words is a boundary of GermanTransliterateStream if no full-text op matches across it
+        and the ops of the word loop do not look at the other word, i.e. both are words of letters (with punctuation
+        at the end, thus no numbers and no currency symbols), no acronyms (e.g. "TEURO") and no unit after the space
+        (e.g. "eins kg" -> "ein kilogramm")
+
+        :param word: word before the space
+        :param next_word: word after the space
+        :return: True if the words are transliterated independently of each other
+        """
+
+        stem = word.rstrip('.,;:!?')
+        if not stem.isalpha() or not next_word.rstrip('.,;:!?').isalpha():
+            return False
+        if self.regex.DETECT_UPPERCASE_RUN.search(word) or self.regex.DETECT_UPPERCASE_RUN.search(next_word):
+            return False
+        return next_word not in self.unit_index and next_word.lower() not in self.unit_index
+
+    def _transliterate(self, text):
+        """
+        transliterates a text without memo (see transliterate)
+
+        :param text: the (messy, not normalized, ...) text to be transliterated to a normalized form
+        :return: the normalized form of the given text
+        """
+
         # GENERAL NOTE: The order of transliterate_ops executed (set via input config parameter transliterate_ops)
         #               is IMPORTANT and not interchangeable!
 
@@ -1059,9 +1911,13 @@ class GermanTransliterate:
 
         try:
 
-            text = self._mask_acronym(text)
-            if 'acronym_phoneme' in self.transliterate_ops:
-                text = self._acronym_phoneme_op(text)
+            # ops whose trigger characters are absent are skipped (e.g. plain prose without digits or acronyms)
+            features = self._profile(text)
+
+            # NOTE: masked acronyms are no longer detected as acronyms, i.e. transliterate_op "acronym_phoneme" would
+            #       only find the excluded ones (which it leaves as they are) - masking covers both in one pass
+            if self._applicable('_mask_acronym', features):
+                text = self._mask_acronym(text)
 
             # MAKE LOWERCASE (only AFTER acronym processing!)
             if self.make_lowercase:
@@ -1070,70 +1926,31 @@ class GermanTransliterate:
             if 'accent_peculiarity' in self.transliterate_ops:
                 text = self._accent_peculiarity_op(text)
 
-            if 'amount_money' in self.transliterate_ops:
+            if 'amount_money' in self.transliterate_ops and self._applicable('_amount_money_op', features):
                 text = self._amount_money_op(text)
 
             # TODO (OPTIONAL): cover also time durations
-            if 'date' in self.transliterate_ops:
+            if 'date' in self.transliterate_ops and self._applicable('_date_op', features):
                 text = self._date_op(text)
 
-            if 'timestamp' in self.transliterate_ops:
+            if 'timestamp' in self.transliterate_ops and self._applicable('_timestamp_op', features):
                 text = self._timestamp_op(text)
 
-            if 'time_of_day' in self.transliterate_ops:
+            if 'time_of_day' in self.transliterate_ops and self._applicable('_timeofday_op', features):
                 text = self._timeofday_op(text)
 
             # Second: iterate over all single words of the text (split by space character)
 
             # split full text (as list)
             split_text = text.split(' ')
-            # list of cleaned/normalized/transliterated words (as derived from split_text)
-            cleaned_words = []
 
-            idx = 0
-            for word in split_text:
-                if not word:
-                    continue
-
-                # EXPAND CHARACTERS AND TERMS for transliteration
-                for tr in self.transliterate_ops:
-                    # WEEKDAYS
-                    if tr == 'weekday':
-                        word = self._weekday_op(word)
-                    # MONTH
-                    elif tr == 'month':
-                        word = self._month_op(word)
-
-                    # ORDINAL NUMBERS
-                    elif tr == 'ordinal':
-                        word = self._ordinal_op(word, idx, split_text, cleaned_words)
-
-                    # SPECIAL TERMS or CHARACTERS
-                    # TODO: because of the kind of split, only statements/terms with a single word
-                    #       are covered currently (e.g. "8/10" but not "8 / 10")
-                    elif tr == 'special':
-                        word = self._special_op(word)
-
-                    # SOME MATH SYMBOLS
-                    elif tr == 'math_symbol':
-                        word = self._math_symbol_op(word)
-
-                    # SPOKEN SYMBOLS (e.g. brackets as "in Klammern")
-                    elif tr == 'spoken_symbol':
-                        word = self._spoken_symbol_op(word, idx, split_text)
-
-                # REPLACE/MAP (remaining) SPECIFIC TERMS/CHARACTERS
-                for old, new in self.replace.items():
-                    word = word.replace(old, new)
-
-                # REPLACE/MAP miscellaneous abbreviations or short forms
-                word = self._misc_abbreviation_op(word)
+            # positions of the closing symbols of op "spoken_symbol" (indexed once per text)
+            closers = None
+            if 'spoken_symbol' in self.transliterate_ops \
+                    and self._applicable('_index_spoken_symbol_closers', features):
+                closers = self._index_spoken_symbol_closers(text, split_text)
 
-                # TRANSLITERATE NUMBERS in combination with misc. units (both attached and separated units)
-                word = self._number_unit_op(word, idx, cleaned_words)
-
-                cleaned_words.append(word)
-                idx += 1
+            cleaned_words = self._scan_words(split_text, closers)
 
             # WRAP UP
 
@@ -1149,9 +1966,68 @@ class GermanTransliterate:
             print('', file=sys.stderr)
             raise e
 
+    def config(self):
+        """
+        :return: dict of the constructor parameters of this instance (except tracer and memo), e.g. to build an equal instance in another process
+        """
+
+        return {
+            'transliterate_ops': self.transliterate_ops,
+            'replace': self.replace,
+            'sep_abbreviation': self.sep_abbreviation,
+            'make_lowercase': self.make_lowercase,
+            'engine': self.engine,
+        }
+
+    def transliterate_many(self, texts, workers=None, chunksize=64):
+        """
+        Transliterates many texts (e.g. a corpus of TTS or ASR training data) in chunks on a pool of worker processes;
+        every worker builds its own instance once from config(), results are yielded in input order and at most
+        2 * workers chunks are in flight (i.e. memory is bounded, also for unbounded iterables)
+
+        NOTE: the tracer and the memo of this instance are not used in the worker processes
+
+        :param texts: iterable of texts to be transliterated
+        :param workers: number of worker processes (default: number of CPUs), with workers=1 everything is processed in this process
+        :param chunksize: number of texts sent to a worker at once
+        :return: generator of the normalized texts (in the order of texts)
+        """
+
+        try:
+            workers = workers or os.cpu_count() or 1
+            texts = iter(texts)
+
+            if workers == 1:
+                for text in texts:
+                    yield self.transliterate(text)
+                return
+
+            # imported here, it is the most expensive import of this module otherwise
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.config(),)) as executor:
+                futures = collections.deque()
+                while True:
+                    chunk = list(itertools.islice(texts, chunksize))
+                    if chunk:
+                        futures.append(executor.submit(_transliterate_chunk, chunk))
+                    if futures and (not chunk or len(futures) >= 2 * workers):
+                        for text in futures.popleft().result():
+                            yield text
+                    if not futures:
+                        return
+        except Exception as e:
+            print('', file=sys.stderr)
+            print('*** An exception occurred in section', sys._getframe().f_code.co_name,
+                  'of class', type(self).__name__, '- see Traceback for details',
+                  file=sys.stderr)
+            print('', file=sys.stderr)
+            raise e
+
     def _transliterate_number(self, number: str) -> str:
         """
-        Uses library num2words for transliterating numbers (also floats or with decimal point numbers)
+        Uses library num2words (memoized, see NUMBER_WORDS) for transliterating numbers (also floats or with decimal point numbers)
 
         IMPORTANT NOTE: GERMAN version means 1000's marks is "."
         and decimal point is "," (the opposite of in English)
@@ -1169,14 +2045,14 @@ class GermanTransliterate:
                 # floating number only
                 if number.count(',') == 1:
                     number = number.replace(',', '.')
-                    word = num2words(float(number), lang='de', to='cardinal').lower()
+                    word = NUMBER_WORDS(float(number), 'cardinal').lower()
                 # 1000's marks only
                 elif number.count('.') >= 1:
                     number = number.replace('.', '')
-                    word = num2words(int(number), lang='de', to='cardinal').lower()
+                    word = NUMBER_WORDS(int(number), 'cardinal').lower()
                 # integer only
                 else:
-                    word = num2words(int(number), lang='de', to='cardinal').lower()
+                    word = NUMBER_WORDS(int(number), 'cardinal').lower()
             except ValueError:
                 # ignore HERE: mixed numbers are handled further down in the pipeline!
                 word = number
@@ -1190,14 +2066,239 @@ class GermanTransliterate:
             raise e
 
 
+class GermanTransliterateStream:
+    """
+    Incremental transliteration of text arriving in chunks (e.g. tokens of a language model or live captions): the text
+    fed so far is transliterated up to its last safe boundary (see GermanTransliterate._stream_boundary and
+    _SpokenSymbolBalance), the rest is kept until later chunks (or flush) complete it; every word is scanned once
+    and transliterated once, i.e. the cost of a chunk is proportional to its size (and the text finalized with it)
+
+    The concatenated outputs equal GermanTransliterate.transliterate of the whole text, except for ordinals and spoken
+    symbols after empty words: they are looked up as if the text started at the last boundary (see
+    GermanTransliterate._sentences)
+    """
+
+    def __init__(self, transliterator):
+        """
+        Constructor
+
+        :param transliterator: GermanTransliterate instance (may have a memo, see TransliterationMemo)
+        """
+        self.transliterator = transliterator
+        self.pairs = tuple(transliterator.abbreviation_config.SPOKEN_SYMBOL.keys()) \
+            if 'spoken_symbol' in transliterator.transliterate_ops else ()
+
+        # complete words (followed by a space) after the last boundary and the pieces of the incomplete last word
+        self._words = []
+        self._partial = []
+        self._balance = _SpokenSymbolBalance(self.pairs)
+        self._plain = True
+        # True if the output so far ends with a space, None if there is no output yet
+        self._trailing_space = None
+
+    def feed(self, chunk):
+        """
+        :param chunk: next part of the text (any split, e.g. within words or numbers)
+        :return: normalized text finalized by this chunk (possibly empty), to be concatenated with the outputs before
+        """
+
+        try:
+            self._partial.append(chunk)
+            if ' ' not in chunk:
+                return ''
+
+            parts = ''.join(self._partial).split(' ')
+            self._partial = [parts.pop()]
+
+            cut = 0
+            for word in parts:
+                if self._words and self._balance.closed(self._plain) \
+                        and self.transliterator._stream_boundary(self._words[-1], word):
+                    cut = len(self._words)
+                    self._balance = _SpokenSymbolBalance(self.pairs)
+                    self._plain = True
+                self._words.append(word)
+                if self.pairs:
+                    self._balance.add(word)
+                if self._plain and (not word or self.transliterator.regex.DETECT_DIGIT.search(word)):
+                    self._plain = False
+
+            if not cut:
+                return ''
+            text = ' '.join(self._words[:cut])
+            del self._words[:cut]
+            return self._emit(text)
+        except Exception as e:
+            print('', file=sys.stderr)
+            print('*** An exception occurred in section', sys._getframe().f_code.co_name,
+                  'of class', type(self).__name__, '- see Traceback for details',
+                  file=sys.stderr)
+            print('', file=sys.stderr)
+            raise e
+
+    def flush(self):
+        """
+        :return: normalized text of the rest (end of the text), the stream can be fed with a new text afterwards
+        """
+
+        try:
+            text = ' '.join(self._words + [''.join(self._partial)])
+            output = self._emit(text) if text else ''
+            self._words = []
+            self._partial = []
+            self._balance = _SpokenSymbolBalance(self.pairs)
+            self._plain = True
+            self._trailing_space = None
+            return output
+        except Exception as e:
+            print('', file=sys.stderr)
+            print('*** An exception occurred in section', sys._getframe().f_code.co_name,
+                  'of class', type(self).__name__, '- see Traceback for details',
+                  file=sys.stderr)
+            print('', file=sys.stderr)
+            raise e
+
+    def _emit(self, text):
+        # outputs are joined by one space (as the words in GermanTransliterate.transliterate)
+        output = self.transliterator.transliterate(text)
+        if not output:
+            return ''
+        if self._trailing_space is not None:
+            if self._trailing_space and output.startswith(' '):
+                output = output[1:]
+            elif not self._trailing_space and not output.startswith(' '):
+                output = ' ' + output
+        self._trailing_space = output.endswith(' ')
+        return output
+
+
+# instance of a worker process of GermanTransliterate.transliterate_many (built once per process)
+_worker_transliterator = None
+
+
+def _init_worker(config):
+    global _worker_transliterator
+    _worker_transliterator = GermanTransliterate(**config)
+
+
+def _transliterate_chunk(texts):
+    return [_worker_transliterator.transliterate(text) for text in texts]
+
+
+def _read_lines(paths):
+    """
+    :param paths: input files, '-' is stdin
+    :return: generator of the lines of all files (without line breaks), read lazily
+    """
+    for path in paths:
+        if path == '-':
+            for line in sys.stdin:
+                yield line.rstrip('\n')
+        else:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    yield line.rstrip('\n')
+
+
 if __name__ == "__main__":
+    import argparse
+    import codecs
+    import json
+
+    parser = argparse.ArgumentParser(description='Transliterate German text to a normalized form, either a single '
+                                                 'text or a corpus line by line (streamed with constant memory)')
+    parser.add_argument('text', nargs='?', default=None, help='single text to be transliterated')
+    parser.add_argument('--input', nargs='+', default=None, metavar='FILE',
+                        help='transliterate these files line by line instead ("-" is stdin)')
+    parser.add_argument('--output', default=None, help='output file (default: stdout)')
+    parser.add_argument('--jsonl', default=None, metavar='FIELD',
+                        help='lines are JSON objects, the text in FIELD is transliterated (other fields are kept)')
+    parser.add_argument('--workers', type=int, default=1, help='number of worker processes (see transliterate_many)')
+    parser.add_argument('--chunksize', type=int, default=64, help='chunk size of transliterate_many')
+    parser.add_argument('--engine', choices=GermanTransliterate.ENGINES, default='sequential')
+    parser.add_argument('--prewarm', action='store_true',
+                        help='convert common numbers in advance (see NumberWordsCache.prewarm)')
+    parser.add_argument('--memo', type=float, default=0, metavar='MB',
+                        help='memoize repeated sentences in a TransliterationMemo of this size (0 disables it)')
+    parser.add_argument('--stream', action='store_true',
+                        help='transliterate stdin as it arrives (e.g. piped from a language model), the normalized '
+                             'text of each line is written as soon as it is final (see GermanTransliterateStream)')
+    parser.add_argument('--progress', type=float, default=10.0, metavar='SECONDS',
+                        help='interval of the progress report to stderr, 0 disables it')
+    args = parser.parse_args()
+
     # execute default usage if run as script
-    if len(sys.argv) < 2:
+    if args.text is None and not args.input and not args.stream:
         print('ERROR: No text given')
         sys.exit(-1)
 
-    ops = {'accent_peculiarity', 'amount_money', 'date', 'timestamp', 'time_of_day', 'ordinal', 'special'}
-
-    text = sys.argv[1]
-    normalized_text = GermanTransliterate(transliterate_ops=ops).transliterate(text)
-    print(normalized_text)
\ No newline at end of file
+    ops = ['accent_peculiarity', 'amount_money', 'date', 'timestamp', 'time_of_day', 'ordinal', 'special']
+    memo = TransliterationMemo(int(args.memo * 2 ** 20)) if args.memo else None
+    transliterator = GermanTransliterate(transliterate_ops=ops, engine=args.engine, memo=memo)
+    if args.prewarm:
+        # before the worker processes are started, i.e. they get the memo as well (if forked)
+        NUMBER_WORDS.prewarm()
+
+    if args.text is not None:
+        print(transliterator.transliterate(args.text))
+        sys.exit(0)
+
+    if args.stream:
+        # every line is a text of its own (as with --input -), but read in whatever pieces arrive
+        stream = GermanTransliterateStream(transliterator)
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        pending = False
+        for data in iter(functools.partial(os.read, sys.stdin.fileno(), 4096), b''):
+            *lines, rest = decoder.decode(data).split('\n')
+            for line in lines:
+                sys.stdout.write(stream.feed(line) + stream.flush() + '\n')
+            sys.stdout.write(stream.feed(rest))
+            sys.stdout.flush()
+            pending = bool(rest) or (pending and not lines)
+        if pending:
+            sys.stdout.write(stream.flush() + '\n')
+        sys.exit(0)
+
+    lines = _read_lines(args.input)
+    records = None
+    if args.jsonl:
+        # the records wait for their normalized text (in order), at most the chunks in flight are held in memory
+        records = collections.deque()
+
+        def texts_of(json_lines):
+            for json_line in json_lines:
+                record = json.loads(json_line)
+                records.append(record)
+                yield record[args.jsonl]
+
+        lines = texts_of(line for line in lines if line.strip())
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    count = characters = 0
+    started_at = reported_at = time.perf_counter()
+    try:
+        for normalized in transliterator.transliterate_many(lines, workers=args.workers, chunksize=args.chunksize):
+            if records is not None:
+                record = records.popleft()
+                record[args.jsonl] = normalized
+                normalized = json.dumps(record, ensure_ascii=False)
+            output.write(normalized + '\n')
+
+            count += 1
+            characters += len(normalized)
+            if args.progress and time.perf_counter() - reported_at >= args.progress:
+                reported_at = time.perf_counter()
+                print('%d lines, %.1f lines/s, %.0f characters/s (output)'
+                      % (count, count / (reported_at - started_at), characters / (reported_at - started_at)),
+                      file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started_at
+    if args.progress:
+        print('done: %d lines in %.1fs, %.1f lines/s' % (count, elapsed, count / max(elapsed, 1e-9)), file=sys.stderr)
+        if args.workers == 1:
+            print('number words memo:', NUMBER_WORDS.stats(), file=sys.stderr)
+            if memo:
+                print('sentence memo:', memo.stats(), file=sys.stderr)
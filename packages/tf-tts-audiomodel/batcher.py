@@ -0,0 +1,153 @@
+import argparse
+import queue
+import sys
+import threading
+import time
+
+from concurrent.futures import Future
+
+sys.path.append("3rdparty")
+
+from synthesizer import Synthesizer
+
+# sentinel put on the queue to stop the worker thread
+_STOP = object()
+
+
+class _PendingRequest:
+    __slots__ = ('input_ids', 'speaker_id', 'future', 'submitted_at')
+
+    def __init__(self, input_ids, speaker_id):
+        self.input_ids = input_ids
+        self.speaker_id = speaker_id
+        self.future = Future()
+        self.submitted_at = time.perf_counter()
+
+
+class DynamicBatcher:
+    """
+    Groups pending text-to-mel requests of similar input length into batches so that tacotron2 runs one forward pass
+    per batch instead of one per sentence; padding is kept small by bucketing the requests by input length
+    """
+
+    def __init__(self, synthesizer, max_batch_size=8, max_wait=0.02, bucket_width=20):
+        """
+        Constructor
+
+        :param synthesizer: loaded Synthesizer instance
+        :param max_batch_size: a bucket is run as soon as it holds this many requests
+        :param max_wait: a bucket is run at the latest when its oldest request waited this long (in seconds)
+        :param bucket_width: width of the fixed input length buckets, only requests of the same bucket are batched together (lengths [0, width), [width, 2 * width), ..., e.g. lengths 19 and 20 never share a batch with the default width)
+        """
+        self.synthesizer = synthesizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.bucket_width = bucket_width
+
+        self.batches = 0
+        self.batched_requests = 0
+
+        self._queue = queue.Queue()
+        self._buckets = {}
+        self._worker = threading.Thread(target=self._run, name='tacotron2-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, input_ids, speaker_id=0):
+        """
+        Enqueues a single utterance
+
+        :param input_ids: input ids as given by Synthesizer.text_to_sequence
+        :param speaker_id: speaker id passed to tacotron2
+        :return: concurrent.futures.Future resolving to the mel outputs with shape [1, frames, n_mels]
+        """
+        request = _PendingRequest(input_ids, speaker_id)
+        self._queue.put(request)
+        return request.future
+
+    def text_to_mel(self, input_ids, speaker_id=0):
+        """
+        Blocking counterpart of submit(), same signature as Synthesizer.text_to_mel
+
+        :param input_ids: input ids as given by Synthesizer.text_to_sequence
+        :param speaker_id: speaker id passed to tacotron2
+        :return: mel outputs with shape [1, frames, n_mels]
+        """
+        return self.submit(input_ids, speaker_id).result()
+
+    def close(self):
+        """
+        Runs all pending requests and stops the worker thread
+        """
+        self._queue.put(_STOP)
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._buckets:
+                oldest = min(items[0].submitted_at for items in self._buckets.values())
+                timeout = max(0.0, oldest + self.max_wait - time.perf_counter())
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                request = None
+
+            if request is _STOP:
+                for key in list(self._buckets):
+                    self._run_bucket(key)
+                return
+
+            if request is not None:
+                key = len(request.input_ids) // self.bucket_width
+                self._buckets.setdefault(key, []).append(request)
+
+            now = time.perf_counter()
+            for key, items in list(self._buckets.items()):
+                if len(items) >= self.max_batch_size or now - items[0].submitted_at >= self.max_wait:
+                    self._run_bucket(key)
+
+    def _run_bucket(self, key):
+        items = self._buckets.pop(key)
+        for start in range(0, len(items), self.max_batch_size):
+            batch = items[start:start + self.max_batch_size]
+            try:
+                mels = self.synthesizer.text_to_mel_batch([it.input_ids for it in batch],
+                                                          [it.speaker_id for it in batch])
+            except Exception as e:
+                for it in batch:
+                    it.future.set_exception(e)
+                continue
+            self.batches += 1
+            self.batched_requests += len(batch)
+            for it, mel in zip(batch, mels):
+                it.future.set_result(mel)
+
+
+if __name__ == "__main__":
+    # compare one forward pass per sentence with batched forward passes
+    parser = argparse.ArgumentParser(description='Tacotron2 throughput: sequential vs. dynamically batched')
+    parser.add_argument('--sentences', type=int, default=32)
+    parser.add_argument('--max-batch-size', type=int, default=8)
+    args = parser.parse_args()
+
+    texts = ["Sentence number %d is synthesized to compare the throughput of batched inference." % i
+             for i in range(args.sentences)]
+
+    synthesizer = Synthesizer()
+    input_ids_list = [synthesizer.text_to_sequence(text) for text in texts]
+
+    started_at = time.perf_counter()
+    for input_ids in input_ids_list:
+        synthesizer.text_to_mel(input_ids)
+    sequential = time.perf_counter() - started_at
+
+    batcher = DynamicBatcher(synthesizer, max_batch_size=args.max_batch_size)
+    started_at = time.perf_counter()
+    futures = [batcher.submit(input_ids) for input_ids in input_ids_list]
+    for future in futures:
+        future.result()
+    batched = time.perf_counter() - started_at
+    batcher.close()
+
+    print('sequential: %.2f sentences/s' % (len(texts) / sequential))
+    print('batched:    %.2f sentences/s (%d batches)' % (len(texts) / batched, batcher.batches))
@@ -0,0 +1,497 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+sys.path.append("3rdparty")
+
+from metrics import StageTracer
+from metrics import summarize
+
+# fixed corpus: every sentence list is synthesized at several lengths (first 1, 3 and all sentences joined)
+CORPUS = {
+    'de': [
+        "Am 3. Oktober 2020 kostete die Aktie 12,50 € und der DAX stieg um 1,5 %.",
+        "Die EZB hat den Leitzins zum 1.1.2021 auf 0,25 % gesenkt, sagte Dr. Müller um 14:30 Uhr.",
+        "Für 2 kg Äpfel zahlt man ca. 3,99 EUR, inkl. MwSt.",
+        "Der Zug fährt um 7.45 h ab und braucht 2:15 Stunden bis München.",
+        "Im Jahr 1999 hatte die Firma 1.250 Mitarbeiter (davon 3/4 in Vollzeit).",
+        "Herr Prof. Schmidt wohnt in der Hauptstraße 12 in St. Gallen.",
+        "Die Strecke ist 42,195 km lang und der Rekord liegt bei 2:01:09.",
+        "Bitte überweisen Sie 1.000 $ bis zum 15. März auf das Konto der GmbH.",
+    ],
+    'en': [
+        "The react-declarative template engine allows you build highly customizable forms without side effects in truly functional style.",
+        "Please enter your password to continue.",
+        "Your order number is four hundred and twelve, it will be shipped tomorrow morning.",
+        "Thank you for calling, how can I help you today?",
+        "The quick brown fox jumps over the lazy dog.",
+        "Temperatures will reach twenty five degrees in the afternoon, with light winds from the west.",
+        "All systems are operating normally and no action is required.",
+        "The meeting has been moved to Thursday at three in the afternoon.",
+    ],
+}
+
+LENGTHS = {'short': 1, 'medium': 3, 'long': None}
+
+# schedule/log like line with a date, a time of day and a timestamp (see run_datetime)
+DATETIME_LINE = 'am %d.%d.%d um %d.%02d uhr, dauer %d:%02d:%02d.'
+
+# ops of GermanTransliterate scanning the full text for dates and times (in the order of transliterate)
+DATETIME_OPS = ('_date_op', '_timestamp_op', '_timeofday_op')
+
+STAGES = ('transliterate', 'text_to_sequence', 'text_to_mel', 'mel_to_wav')
+
+# differential corpus of GermanTransliterate (generated texts with numbers, dates, currencies, acronyms and spoken
+# symbols, and documents of several sentences, some repeated), see self_check
+DIFFERENTIAL_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_corpus_de.txt')
+
+
+def corpus():
+    """
+    :return: list of (language, length name, sentences) of the fixed benchmark corpus
+    """
+    items = []
+    for language, sentences in CORPUS.items():
+        for length, count in LENGTHS.items():
+            items.append((language, length, sentences[:count]))
+    return items
+
+
+def peak_rss_mb():
+    """
+    :return: peak resident set size of this process in MiB
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return rss / 2 ** 20 if sys.platform == 'darwin' else rss / 2 ** 10
+
+
+def measure_construction(count=1000):
+    """
+    :param count: number of instances constructed
+    :return: mean time of constructing a GermanTransliterate (after the first one, i.e. with the shared artifacts)
+    """
+    from german_transliterate.core import GermanTransliterate
+
+    started_at = time.perf_counter()
+    for idx in range(count):
+        # e.g. settings per tenant
+        GermanTransliterate(replace={'-': ' '}, sep_abbreviation=(' ', ' -- ')[idx % 2])
+    return (time.perf_counter() - started_at) / count
+
+
+def run(repeats=5, frontend_only=False, export_dir=None, vocoder_tflite=None, trace_ops=False, engine='sequential'):
+    """
+    Runs the fixed corpus through GermanTransliterate (German texts) and the models
+
+    :param repeats: number of runs per corpus item
+    :param frontend_only: if True, only the transliterate stage is measured (no tensorflow needed)
+    :param export_dir: passed to Synthesizer (see export.py)
+    :param vocoder_tflite: passed to Synthesizer (see quantize.py)
+    :param trace_ops: if True, the latencies of every single transliterate op are reported, too (adds tracing overhead)
+    :param engine: engine of GermanTransliterate ('sequential' or 'prefilter')
+    :return: dict with the results (JSON serializable)
+    """
+    started_at = time.perf_counter()
+    from german_transliterate.core import GermanTransliterate
+    frontend_import_time = time.perf_counter() - started_at
+    op_tracer = StageTracer(window=None) if trace_ops else None
+    transliterator = GermanTransliterate(tracer=op_tracer, engine=engine)
+    frontend_load_time = time.perf_counter() - started_at
+    frontend_construction_time = measure_construction()
+
+    synthesizer = None
+    model_load_time = None
+    if not frontend_only:
+        from synthesizer import Synthesizer
+        from synthesizer import SAMPLE_RATE
+        synthesizer = Synthesizer(export_dir=export_dir, vocoder_tflite=vocoder_tflite)
+        model_load_time = synthesizer.load_time
+
+    timings = {stage: [] for stage in STAGES}
+    items = []
+    for language, length, sentences in corpus():
+        item_timings = {stage: [] for stage in STAGES}
+        real_time_factors = []
+        for _ in range(repeats):
+            # the front end only applies to German, sentence by sentence (as done by the SentencePipeline)
+            normalized = ' '.join(sentences)
+            if language == 'de':
+                started_at = time.perf_counter()
+                normalized = ' '.join(transliterator.transliterate(sentence) for sentence in sentences)
+                item_timings['transliterate'].append(time.perf_counter() - started_at)
+            if synthesizer is None:
+                continue
+
+            started_at = time.perf_counter()
+            input_ids = synthesizer.text_to_sequence(normalized)
+            item_timings['text_to_sequence'].append(time.perf_counter() - started_at)
+
+            started_at = time.perf_counter()
+            mel_outputs = synthesizer.text_to_mel(input_ids)
+            item_timings['text_to_mel'].append(time.perf_counter() - started_at)
+
+            started_at = time.perf_counter()
+            audio = synthesizer.mel_to_wav(mel_outputs)
+            item_timings['mel_to_wav'].append(time.perf_counter() - started_at)
+
+            elapsed = sum(item_timings[stage][-1] for stage in STAGES if item_timings[stage])
+            real_time_factors.append(elapsed / (len(audio) / SAMPLE_RATE))
+
+        for stage in STAGES:
+            timings[stage].extend(item_timings[stage])
+        items.append({
+            'language': language,
+            'length': length,
+            'characters': sum(len(sentence) for sentence in sentences),
+            'stages': {stage: summarize(values) for stage, values in item_timings.items() if values},
+            'real_time_factor': summarize(real_time_factors) if real_time_factors else None,
+        })
+
+    results = {
+        'python': platform.python_version(),
+        'repeats': repeats,
+        'engine': engine,
+        'frontend_import_time': frontend_import_time,
+        'frontend_load_time': frontend_load_time,
+        'frontend_construction_time': frontend_construction_time,
+        'model_load_time': model_load_time,
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': {stage: summarize(values) for stage, values in timings.items() if values},
+        'items': items,
+    }
+    if op_tracer:
+        results['transliterate_ops'] = op_tracer.summary()
+    return results
+
+
+def run_corpus(path, repeats=1, trace_ops=False, engine='sequential', verify=False, prewarm=False, memo_mb=None):
+    """
+    Runs GermanTransliterate over a (large) corpus file, one text per line
+
+    :param path: corpus file (UTF-8)
+    :param repeats: number of passes over the corpus
+    :param trace_ops: if True, the latencies of every single transliterate op are reported, too
+    :param engine: engine of GermanTransliterate ('sequential' or 'prefilter')
+    :param verify: if True, every output is compared with the output of engine 'sequential' (differential test)
+    :param prewarm: if True, the memo of num2words is prewarmed before (see NumberWordsCache.prewarm)
+    :param memo_mb: if given, sentences are memoized in a TransliterationMemo of this size (in MB)
+    :return: dict with the results (JSON serializable)
+    """
+    from german_transliterate.core import GermanTransliterate
+    from german_transliterate.core import NUMBER_WORDS
+    from german_transliterate.core import TransliterationMemo
+
+    with open(path, encoding='utf-8') as f:
+        lines = [line.rstrip('\n') for line in f if line.strip()]
+
+    if prewarm:
+        started_at = time.perf_counter()
+        NUMBER_WORDS.prewarm()
+        prewarm_time = time.perf_counter() - started_at
+    op_tracer = StageTracer(window=None) if trace_ops else None
+    memo = TransliterationMemo(int(memo_mb * 2 ** 20)) if memo_mb else None
+    transliterator = GermanTransliterate(tracer=op_tracer, engine=engine, memo=memo)
+
+    latencies = []
+    errors = 0
+    started_at = time.perf_counter()
+    for _ in range(repeats):
+        for line in lines:
+            line_started_at = time.perf_counter()
+            try:
+                transliterator.transliterate(line)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - line_started_at)
+    elapsed = time.perf_counter() - started_at
+
+    results = {
+        'python': platform.python_version(),
+        'repeats': repeats,
+        'engine': engine,
+        'lines': len(lines),
+        'characters': sum(len(line) for line in lines),
+        'errors': errors,
+        'lines_per_second': len(latencies) / elapsed,
+        'characters_per_second': repeats * sum(len(line) for line in lines) / elapsed,
+        'peak_rss_mb': peak_rss_mb(),
+        'prewarm_time': prewarm_time if prewarm else None,
+        'stages': {'transliterate': summarize(latencies)},
+    }
+    if op_tracer:
+        results['transliterate_ops'] = op_tracer.summary()
+    results['number_words'] = NUMBER_WORDS.stats()
+    if memo:
+        results['memo'] = memo.stats()
+    if verify:
+        results['verify'] = verify_engine(lines, engine, memo_mb)
+    return results
+
+
+def run_many(path, workers=(1, 2, 4), chunksize=64):
+    """
+    Measures the throughput of GermanTransliterate.transliterate_many over a corpus file for several numbers of
+    worker processes
+
+    :param path: corpus file (UTF-8), one text per line
+    :param workers: numbers of worker processes to be measured
+    :param chunksize: passed to transliterate_many
+    :return: dict with the results (JSON serializable)
+    """
+    from german_transliterate.core import GermanTransliterate
+
+    with open(path, encoding='utf-8') as f:
+        lines = [line.rstrip('\n') for line in f if line.strip()]
+
+    transliterator = GermanTransliterate()
+    runs = []
+    for count in workers:
+        started_at = time.perf_counter()
+        for _ in transliterator.transliterate_many(lines, workers=count, chunksize=chunksize):
+            pass
+        elapsed = time.perf_counter() - started_at
+        runs.append({'workers': count, 'seconds': elapsed, 'lines_per_second': len(lines) / elapsed})
+    for run_ in runs:
+        run_['speedup'] = runs[0]['seconds'] / run_['seconds']
+
+    return {
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'lines': len(lines),
+        'chunksize': chunksize,
+        'runs': runs,
+    }
+
+
+def verify_numbers(limit=10 ** 6, floats=100000, seed=0):
+    """
+    Exhaustive differential test of GermanNumberSpeller against num2words(lang='de'): cardinals (int) in
+    (-limit, limit), ordinals and years (str, as passed by GermanTransliterate) in [0, limit) and random floats with
+    up to 3 decimals (as parsed from decimal-comma numbers); also measures the time per number of both
+
+    :param limit: upper bound (exclusive) of the tested range
+    :param floats: number of random floats tested
+    :param seed: seed of the random floats
+    :return: dict with the number of mismatches per mode, (at most 10) mismatching examples and the speedup
+    """
+    import random
+
+    from num2words import num2words
+    from german_transliterate.core import NUMBER_SPELLER
+
+    rng = random.Random(seed)
+    cases = {
+        'cardinal': [(n, 'cardinal') for n in range(-limit + 1, limit)],
+        'cardinal_float': [(float('%d.%0*d' % (rng.randrange(limit), decimals, rng.randrange(10 ** decimals))), 'cardinal')
+                           for decimals in (1, 2, 3) for _ in range(floats // 3)],
+        'ordinal': [(str(n) + '.', 'ordinal') for n in range(limit)],
+        'year': [(str(n), 'year') for n in range(limit)],
+    }
+
+    results = {}
+    examples = []
+    speller_time = num2words_time = 0.0
+    for mode, values in cases.items():
+        mismatches = 0
+        for value, to in values:
+            started_at = time.perf_counter()
+            actual = NUMBER_SPELLER.spell(value, to)
+            speller_time += time.perf_counter() - started_at
+            started_at = time.perf_counter()
+            expected = num2words(value, lang='de', to=to)
+            num2words_time += time.perf_counter() - started_at
+            if actual != expected:
+                mismatches += 1
+                examples.append({'value': value, 'to': to, 'expected': expected, 'actual': actual})
+        results[mode] = {'numbers': len(values), 'mismatches': mismatches}
+
+    return {
+        'modes': results,
+        'mismatches': sum(result['mismatches'] for result in results.values()),
+        'examples': examples[:10],
+        'speedup': num2words_time / speller_time,
+    }
+
+
+def verify_engine(lines, engine, memo_mb=None):
+    """
+    Differential test of an engine of GermanTransliterate (optionally with memo) against engine 'sequential' (the
+    reference)
+
+    :param lines: texts to be transliterated
+    :param engine: engine to be verified
+    :param memo_mb: if given, the engine is verified with a TransliterationMemo of this size (in MB)
+    :return: dict with the number of mismatches and (at most 10) mismatching examples
+    """
+    from german_transliterate.core import GermanTransliterate
+    from german_transliterate.core import TransliterationMemo
+
+    def outcome(transliterator, line):
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                return transliterator.transliterate(line)
+        except Exception as e:
+            # both engines must fail alike, too
+            return 'exception: ' + type(e).__name__
+
+    reference = GermanTransliterate()
+    transliterator = GermanTransliterate(engine=engine,
+                                         memo=TransliterationMemo(int(memo_mb * 2 ** 20)) if memo_mb else None)
+    mismatches = []
+    for line in lines:
+        expected = outcome(reference, line)
+        actual = outcome(transliterator, line)
+        if actual != expected:
+            mismatches.append({'text': line, 'expected': expected, 'actual': actual})
+    return {'lines': len(lines), 'mismatches': len(mismatches), 'examples': mismatches[:10]}
+
+
+def self_check(path=DIFFERENTIAL_CORPUS, limit=2100, floats=900):
+    """
+    Quick differential test of the German frontend, reproducible from the repository: the number speller against
+    num2words (see verify_numbers) and engine 'prefilter' as well as the sentence memo against engine 'sequential' on the
+    differential corpus (see verify_engine)
+
+    :param path: corpus file (UTF-8), one text per line
+    :param limit: upper bound (exclusive) of the numbers tested (covers the years up to 2099, num2words is slow with
+                  ordinals and years, see --verify-numbers for the exhaustive test)
+    :param floats: number of random floats tested
+    :return: dict with the results per check and the total number of mismatches
+    """
+    with open(path, encoding='utf-8') as f:
+        lines = [line.rstrip('\n') for line in f if line.strip()]
+
+    checks = {
+        'numbers': verify_numbers(limit, floats),
+        'engine_prefilter': verify_engine(lines, 'prefilter'),
+        'memo_sequential': verify_engine(lines, 'sequential', memo_mb=1),
+        'memo_prefilter': verify_engine(lines, 'prefilter', memo_mb=1),
+    }
+    return {
+        'checks': checks,
+        'mismatches': sum(check['mismatches'] for check in checks.values()),
+    }
+
+
+def datetime_document(count):
+    """
+    :param count: number of lines
+    :return: (lowercase) document with count dates, times of day and timestamps
+    """
+    return ' '.join(DATETIME_LINE % (1 + i % 28, 1 + i % 12, 1990 + i % 40, i % 24, i % 60, 1 + i % 9, i % 60, (7 * i) % 60)
+                    for i in range(count))
+
+
+def run_datetime(counts=(100, 1000, 5000), repeats=3):
+    """
+    Times the full-text ops for dates and times of GermanTransliterate on documents with thousands of matches,
+    the time per match should stay flat with growing documents (linear cost)
+
+    :param counts: number of lines (i.e. of dates, times of day and timestamps each) per document
+    :param repeats: number of runs per document, the fastest run is reported
+    :return: dict with the results (JSON serializable)
+    """
+    from german_transliterate.core import GermanTransliterate
+
+    transliterator = GermanTransliterate()
+    documents = []
+    for count in counts:
+        text = datetime_document(count)
+        ops = {}
+        for name in DATETIME_OPS:
+            op = getattr(transliterator, name)
+            elapsed = []
+            for _ in range(repeats):
+                started_at = time.perf_counter()
+                result = op(text)
+                elapsed.append(time.perf_counter() - started_at)
+            ops[name.strip('_')] = {'seconds': min(elapsed), 'us_per_match': 1e6 * min(elapsed) / count}
+            # the next op gets the output, as in transliterate
+            text = result
+        documents.append({'matches': count, 'characters': len(datetime_document(count)), 'ops': ops})
+
+    return {
+        'python': platform.python_version(),
+        'repeats': repeats,
+        'documents': documents,
+    }
+
+
+def compare(baseline, current):
+    """
+    :param baseline: results of an earlier run
+    :param current: results of this run
+    :return: dict of stage -> ratio of the p50 latencies (current / baseline, below 1 means faster), empty if one of
+             the runs has no stage timings (e.g. --datetime, --workers or --verify-numbers)
+    """
+    ratios = {}
+    for stage, summary in current.get('stages', {}).items():
+        before = baseline.get('stages', {}).get(stage)
+        if before and before['p50']:
+            ratios[stage] = summary['p50'] / before['p50']
+    return ratios
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark of the synthesis path (RTF, latency percentiles, memory)')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--frontend-only', action='store_true', help='only benchmark GermanTransliterate')
+    parser.add_argument('--export-dir', default=None)
+    parser.add_argument('--vocoder-tflite', default=None)
+    parser.add_argument('--trace-ops', action='store_true', help='report the latency of every transliterate op')
+    parser.add_argument('--corpus', default=None,
+                        help='benchmark GermanTransliterate on this corpus file (one text per line) instead')
+    parser.add_argument('--engine', choices=('sequential', 'prefilter'), default='sequential',
+                        help='engine of GermanTransliterate')
+    parser.add_argument('--verify', action='store_true',
+                        help='with --corpus: compare every output with engine "sequential", exit with an error on mismatch')
+    parser.add_argument('--prewarm', action='store_true', help='with --corpus: prewarm the memo of num2words')
+    parser.add_argument('--memo', type=float, default=None, metavar='MB',
+                        help='with --corpus: memoize sentences in a TransliterationMemo of this size')
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help='with --corpus: measure transliterate_many with these numbers of worker processes')
+    parser.add_argument('--chunksize', type=int, default=64, help='chunk size of transliterate_many')
+    parser.add_argument('--datetime', type=int, nargs='*', default=None, metavar='COUNT',
+                        help='benchmark the date/time ops on documents with COUNT dates and times each instead')
+    parser.add_argument('--verify-numbers', type=int, default=None, metavar='LIMIT',
+                        help='compare the German number speller with num2words on all numbers below LIMIT instead')
+    parser.add_argument('--self-check', action='store_true',
+                        help='run the differential tests of the German frontend on the committed corpus instead')
+    parser.add_argument('--output', default=None, help='write the JSON results to this file')
+    parser.add_argument('--baseline', default=None, help='JSON results of an earlier run to compare with')
+    args = parser.parse_args()
+
+    if args.self_check:
+        results = {'verify': self_check()}
+    elif args.verify_numbers:
+        results = {'verify': verify_numbers(args.verify_numbers)}
+    elif args.datetime is not None:
+        results = run_datetime(args.datetime or (100, 1000, 5000), args.repeats)
+    elif args.corpus and args.workers:
+        results = run_many(args.corpus, args.workers, args.chunksize)
+    elif args.corpus:
+        results = run_corpus(args.corpus, args.repeats, args.trace_ops, args.engine, args.verify, args.prewarm,
+                             args.memo)
+    else:
+        results = run(args.repeats, args.frontend_only, args.export_dir, args.vocoder_tflite, args.trace_ops,
+                      args.engine)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            results['p50_ratio_to_baseline'] = compare(json.load(f), results)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+    print(report)
+
+    if results.get('verify', {}).get('mismatches'):
+        print('ERROR: %d outputs differ from the reference' % results['verify']['mismatches'], file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,329 @@
+import collections
+import hashlib
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+
+from synthesizer import SAMPLE_RATE
+
+DETECT_WHITESPACE_SEQ = re.compile(r'\s+')
+DETECT_CLAUSE_END = re.compile(r'(?<=[,;:\.!?])\s+')
+
+# file extension of the on-disk tier: raw float32 PCM samples, mono, SAMPLE_RATE
+PCM_SUFFIX = '.pcm'
+# suffix of the files being written (renamed to PCM_SUFFIX once complete, leftovers of a crash are removed on start)
+TMP_SUFFIX = '.pcm.tmp'
+
+
+def normalize_text(text):
+    """
+    Normalizes text for cache lookups (whitespace sequences collapsed, leading/trailing whitespace removed)
+
+    :param text: text to be synthesized
+    :return: normalized text
+    """
+    return DETECT_WHITESPACE_SEQ.sub(' ', text).strip()
+
+
+def split_clauses(text):
+    """
+    Splits (normalized) text into clauses at punctuation followed by whitespace, the punctuation is kept
+
+    :param text: text to be synthesized
+    :return: list of non-empty clauses
+    """
+    return [c for c in DETECT_CLAUSE_END.split(normalize_text(text)) if c]
+
+
+class _MemoryLRU:
+    """
+    In-memory LRU of numpy arrays bounded by their total size in bytes (not thread-safe, callers hold a lock)
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._items = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if value.nbytes > self.max_bytes:
+            return
+        if key in self._items:
+            self._items.move_to_end(key)
+            return
+        self._items[key] = value
+        self.size += value.nbytes
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= evicted.nbytes
+            self.evictions += 1
+
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized audio with an in-memory LRU tier and an on-disk tier of raw PCM files,
+    both evicted by size; the key covers everything that influences the audio (text, models, speaker, sample rate)
+    """
+
+    def __init__(self, directory=None, memory_bytes=64 * 2 ** 20, disk_bytes=1024 * 2 ** 20):
+        """
+        Constructor
+
+        :param directory: directory of the on-disk tier, None disables the on-disk tier
+        :param memory_bytes: maximum size of the audio kept in memory
+        :param disk_bytes: maximum size of the audio files kept in directory
+        """
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._memory = _MemoryLRU(memory_bytes)
+        self._disk = collections.OrderedDict()
+        self._disk_size = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            # restore the on-disk tier in order of last access
+            entries = []
+            for name in os.listdir(directory):
+                if name.endswith(TMP_SUFFIX):
+                    self._remove(os.path.join(directory, name))
+                elif name.endswith(PCM_SUFFIX):
+                    stat = os.stat(os.path.join(directory, name))
+                    entries.append((stat.st_mtime, name[:-len(PCM_SUFFIX)], stat.st_size))
+            for _, key, size in sorted(entries):
+                self._disk[key] = size
+                self._disk_size += size
+            for path in self._evict_disk():
+                self._remove(path)
+
+    @staticmethod
+    def key(text, speaker_id=0, model_names=(), sample_rate=SAMPLE_RATE):
+        """
+        :param text: text to be synthesized (normalized with normalize_text)
+        :param speaker_id: speaker id passed to tacotron2
+        :param model_names: names of the processor and models passed to from_pretrained
+        :param sample_rate: sample rate of the audio
+        :return: hex digest identifying the audio
+        """
+        digest = hashlib.sha256()
+        for part in (normalize_text(text), str(speaker_id), *model_names, str(sample_rate)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def key_for(self, synthesizer, text, speaker_id=0):
+        """
+        :param synthesizer: Synthesizer instance which would synthesize the text
+        :param text: text to be synthesized
+        :param speaker_id: speaker id passed to tacotron2
+        :return: cache key (see key)
+        """
+        return self.key(text, speaker_id,
+                        (synthesizer.processor_name, synthesizer.tacotron2_name, synthesizer.mb_melgan_name),
+                        SAMPLE_RATE)
+
+    def get(self, key):
+        """
+        :param key: cache key
+        :return: audio as numpy array or None if not cached
+        """
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self.memory_hits += 1
+                return audio
+            if key not in self._disk:
+                self.misses += 1
+                return None
+
+        # the file I/O runs outside the lock (see put)
+        path = self._path(key)
+        try:
+            audio = np.fromfile(path, dtype=np.float32)
+            os.utime(path)
+        except OSError:
+            audio = None
+
+        with self._lock:
+            if audio is None:
+                # removed from outside (or evicted meanwhile), treat as miss
+                if key in self._disk:
+                    self._disk_size -= self._disk.pop(key)
+                self.misses += 1
+                return None
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self.disk_hits += 1
+            self._memory.put(key, audio)
+            return audio
+
+    def put(self, key, audio):
+        """
+        :param key: cache key
+        :param audio: audio samples (converted to float32)
+        """
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        with self._lock:
+            self._memory.put(key, audio)
+            if not self.directory or key in self._disk:
+                return
+
+        # the file I/O runs outside the lock; the raw PCM file has no header, thus it is written to a temporary file
+        # and renamed when complete, so that a crash never leaves a truncated file which would be served as audio
+        fd, tmp_path = tempfile.mkstemp(suffix=TMP_SUFFIX, dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                audio.tofile(f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        with self._lock:
+            evicted = []
+            if key not in self._disk:
+                self._disk[key] = audio.nbytes
+                self._disk_size += audio.nbytes
+                evicted = self._evict_disk()
+        for path in evicted:
+            self._remove(path)
+
+    def synthesize(self, synthesizer, text, speaker_id=0):
+        """
+        Returns the cached audio of the text or synthesizes (and caches) it
+
+        :param synthesizer: loaded Synthesizer instance
+        :param text: text to be synthesized
+        :param speaker_id: speaker id passed to tacotron2
+        :return: audio samples as numpy array
+        """
+        key = self.key_for(synthesizer, text, speaker_id)
+        audio = self.get(key)
+        if audio is None:
+            audio = synthesizer.synthesize(normalize_text(text), speaker_id)
+            self.put(key, audio)
+        return audio
+
+    def stats(self):
+        """
+        :return: dict with hit/miss counters and tier sizes
+        """
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.memory_hits + self.disk_hits) / lookups if lookups else None,
+            'evictions': self.evictions + self._memory.evictions,
+            'memory_items': len(self._memory),
+            'memory_bytes': self._memory.size,
+            'disk_items': len(self._disk),
+            'disk_bytes': self._disk_size,
+        }
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + PCM_SUFFIX)
+
+    def _evict_disk(self):
+        # returns the paths of the evicted files, which are removed by the caller (outside the lock)
+        paths = []
+        while self._disk_size > self.disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self.evictions += 1
+            paths.append(self._path(key))
+        return paths
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class MelCache:
+    """
+    In-memory LRU of tacotron2 mel outputs per clause: only clauses not seen before run through tacotron2, cached and
+    fresh mel segments are concatenated before vocoding (useful for templated prompts with fixed clauses)
+    """
+
+    def __init__(self, memory_bytes=64 * 2 ** 20):
+        """
+        Constructor
+
+        :param memory_bytes: maximum size of the mel outputs kept in memory
+        """
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory = _MemoryLRU(memory_bytes)
+
+    def text_to_mel(self, synthesizer, text, speaker_id=0, batcher=None):
+        """
+        Same as Synthesizer.text_to_mel but for text (instead of input ids) and served clause by clause from the cache
+
+        :param synthesizer: loaded Synthesizer instance
+        :param text: text to be synthesized
+        :param speaker_id: speaker id passed to tacotron2
+        :param batcher: optional DynamicBatcher used for the uncached clauses
+        :return: mel outputs with shape [1, frames, n_mels]
+        """
+        clauses = split_clauses(text) or [normalize_text(text)]
+        keys = [AudioCache.key(clause, speaker_id, (synthesizer.processor_name, synthesizer.tacotron2_name), 0)
+                for clause in clauses]
+
+        with self._lock:
+            mels = [self._memory.get(key) for key in keys]
+            missing = [idx for idx, mel in enumerate(mels) if mel is None]
+            self.hits += len(mels) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            input_ids_list = [synthesizer.text_to_sequence(clauses[idx]) for idx in missing]
+            if batcher:
+                futures = [batcher.submit(input_ids, speaker_id) for input_ids in input_ids_list]
+                fresh = [future.result() for future in futures]
+            else:
+                fresh = synthesizer.text_to_mel_batch(input_ids_list, [speaker_id] * len(missing))
+            with self._lock:
+                for idx, mel in zip(missing, fresh):
+                    mels[idx] = np.asarray(mel, dtype=np.float32)
+                    self._memory.put(keys[idx], mels[idx])
+
+        return np.concatenate(mels, axis=1)
+
+    def stats(self):
+        """
+        :return: dict with hit/miss counters (per clause) and memory usage
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else None,
+            'evictions': self._memory.evictions,
+            'memory_items': len(self._memory),
+            'memory_bytes': self._memory.size,
+        }
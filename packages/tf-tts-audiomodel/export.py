@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append("3rdparty")
+
+MEASURE_TEXT = "The react-declarative template engine allows you build highly customizable forms without side effects in truly functional style"
+
+
+def export(output):
+    """
+    Writes the processor and SavedModels of tacotron2 and mb_melgan with their fixed inference signatures
+    (input ids [batch, time] int32, input lengths and speaker ids [batch] int32; mel [batch, frames, 80] float32),
+    so that Synthesizer(export_dir=...) neither calls from_pretrained nor retraces the python model code
+
+    :param output: export directory
+    """
+    import tensorflow as tf
+
+    from synthesizer import Synthesizer
+    from synthesizer import EXPORT_MB_MELGAN
+    from synthesizer import EXPORT_META
+    from synthesizer import EXPORT_TACOTRON2
+
+    synthesizer = Synthesizer(warmup=False)
+    os.makedirs(output, exist_ok=True)
+
+    synthesizer.processor.save_pretrained(output)
+    tf.saved_model.save(synthesizer.tacotron2, os.path.join(output, EXPORT_TACOTRON2),
+                        signatures=synthesizer.tacotron2.inference)
+    tf.saved_model.save(synthesizer.mb_melgan, os.path.join(output, EXPORT_MB_MELGAN),
+                        signatures=synthesizer.mb_melgan.inference)
+
+    with open(os.path.join(output, EXPORT_META), 'w', encoding='utf-8') as f:
+        json.dump({
+            'processor_name': synthesizer.processor_name,
+            'tacotron2_name': synthesizer.tacotron2_name,
+            'mb_melgan_name': synthesizer.mb_melgan_name,
+        }, f, indent=2)
+
+
+def measure(export_dir=None, runs=5):
+    """
+    Measures cold start and per-call latency in *this* process (see compare for a fair comparison)
+
+    :param export_dir: directory written by export(), None loads the models with from_pretrained
+    :param runs: number of warm calls averaged for the per-call latency
+    :return: dict with the measured times in seconds
+    """
+    started_at = time.perf_counter()
+    from synthesizer import Synthesizer
+    import_time = time.perf_counter() - started_at
+
+    synthesizer = Synthesizer(warmup=False, export_dir=export_dir)
+
+    started_at = time.perf_counter()
+    synthesizer.synthesize(MEASURE_TEXT)
+    first_call = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    for _ in range(runs):
+        synthesizer.synthesize(MEASURE_TEXT)
+    per_call = (time.perf_counter() - started_at) / runs
+
+    return {
+        'import_time': import_time,
+        'load_time': synthesizer.load_time,
+        'first_call': first_call,
+        'cold_start': import_time + synthesizer.load_time + first_call,
+        'per_call': per_call,
+    }
+
+
+def compare(export_dir, runs=5):
+    """
+    Measures from_pretrained and the export each in a fresh python process and reports the difference
+
+    :param export_dir: directory written by export()
+    :param runs: number of warm calls averaged for the per-call latency
+    :return: dict with both measurements and the relative speedups
+    """
+    results = {}
+    for mode, args in (('pretrained', []), ('exported', ['--export-dir', export_dir])):
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), 'measure',
+                                          '--runs', str(runs)] + args)
+        results[mode] = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+    results['speedup'] = {key: results['pretrained'][key] / results['exported'][key]
+                          for key in ('cold_start', 'load_time', 'first_call', 'per_call')
+                          if results['exported'][key]}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export tacotron2 and mb_melgan as SavedModels with fixed signatures')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    parser_export = subparsers.add_parser('export', help='write the export directory')
+    parser_export.add_argument('--output', default='./exported')
+
+    parser_measure = subparsers.add_parser('measure', help='measure cold start and per-call latency (JSON)')
+    parser_measure.add_argument('--export-dir', default=None)
+    parser_measure.add_argument('--runs', type=int, default=5)
+
+    parser_compare = subparsers.add_parser('compare', help='compare from_pretrained with the export (JSON)')
+    parser_compare.add_argument('--export-dir', default='./exported')
+    parser_compare.add_argument('--runs', type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export(args.output)
+    elif args.command == 'measure':
+        print(json.dumps(measure(args.export_dir, args.runs)))
+    else:
+        print(json.dumps(compare(args.export_dir, args.runs), indent=2))
@@ -1,33 +1,17 @@
 import soundfile as sf
-import numpy as np
 import sys
 
-import tensorflow as tf
-
 sys.path.append("3rdparty")
 
-from tensorflow_tts.inference import AutoProcessor
-from tensorflow_tts.inference import TFAutoModel
-
-tf.config.set_visible_devices([], 'GPU')
+from synthesizer import Synthesizer
+from synthesizer import SAMPLE_RATE
 
-processor = AutoProcessor.from_pretrained("tensorspeech/tts-tacotron2-ljspeech-en")
-tacotron2 = TFAutoModel.from_pretrained("tensorspeech/tts-tacotron2-ljspeech-en")
-mb_melgan = TFAutoModel.from_pretrained("tensorspeech/tts-mb_melgan-ljspeech-en")
+synthesizer = Synthesizer(warmup=False)
 
 text = "The react-declarative template engine allows you build highly customizable forms without side effects in truly functional style"
 
-input_ids = processor.text_to_sequence(text)
-
-# tacotron2 inference (text-to-mel)
-decoder_output, mel_outputs, stop_token_prediction, alignment_history = tacotron2.inference(
-    input_ids=tf.expand_dims(tf.convert_to_tensor(input_ids, dtype=tf.int32), 0),
-    input_lengths=tf.convert_to_tensor([len(input_ids)], tf.int32),
-    speaker_ids=tf.convert_to_tensor([0], dtype=tf.int32),
-)
-
-# melgan inference (mel-to-wav)
-audio = mb_melgan.inference(mel_outputs)[0, :, 0]
+# tacotron2 inference (text-to-mel) and melgan inference (mel-to-wav)
+audio = synthesizer.synthesize(text)
 
 # save to file
-sf.write('./audio.wav', audio, 22050, "PCM_16")
+sf.write('./audio.wav', audio, SAMPLE_RATE, "PCM_16")
@@ -0,0 +1,113 @@
+import collections
+import contextlib
+import math
+import threading
+import time
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile
+
+    :param values: sorted list of values
+    :param p: percentile in range 0..100
+    :return: the percentile value or None for an empty list
+    """
+    if not values:
+        return None
+    return values[max(1, math.ceil(p / 100 * len(values))) - 1]
+
+
+def summarize(values):
+    """
+    :param values: list of measurements (e.g. latencies in seconds)
+    :return: dict with count, mean and the p50/p95/p99 percentiles
+    """
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values) if values else None,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+    }
+
+
+class NullTracer:
+    """
+    Default tracer: spans are no-ops
+    """
+
+    _span = contextlib.nullcontext()
+
+    def span(self, name, **attributes):
+        return self._span
+
+
+NULL_TRACER = NullTracer()
+
+
+class StageTracer:
+    """
+    Collects the durations of timed spans by name (e.g. per synthesis stage), keeping the most recent `window` spans
+    per name; also usable as tracer of GermanTransliterate (which then reports every transliterate op)
+    """
+
+    def __init__(self, window=1000, callback=None):
+        """
+        Constructor
+
+        :param window: number of most recent spans kept per name
+        :param callback: if given, additionally called with (name, duration, attributes) for every finished span
+        """
+        self.window = window
+        self.callback = callback
+        self.durations = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.sizes = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def span(self, name, **attributes):
+        """
+        :param name: name of the span (e.g. stage or op)
+        :param attributes: additional attributes, "size" (input size) is collected
+        :return: context manager timing the span
+        """
+        return _Span(self, name, attributes)
+
+    def emit(self, name, duration, attributes):
+        with self._lock:
+            self.durations[name].append(duration)
+            if 'size' in attributes:
+                self.sizes[name].append(attributes['size'])
+        if self.callback:
+            self.callback(name, duration, attributes)
+
+    def summary(self):
+        """
+        :return: dict of span name -> latency summary (see summarize) including the mean input size
+        """
+        with self._lock:
+            result = {}
+            for name, durations in self.durations.items():
+                result[name] = summarize(list(durations))
+                sizes = self.sizes.get(name)
+                if sizes:
+                    result[name]['mean_size'] = sum(sizes) / len(sizes)
+            return result
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'attributes', 'started_at')
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.emit(self.name, time.perf_counter() - self.started_at, self.attributes)
+        return False
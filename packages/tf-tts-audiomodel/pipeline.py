@@ -0,0 +1,133 @@
+import argparse
+import collections
+import re
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+sys.path.append("3rdparty")
+
+from synthesizer import Synthesizer
+from synthesizer import SAMPLE_RATE
+
+DETECT_PARAGRAPH_END = re.compile(r'\n\s*\n')
+DETECT_SENTENCE_END = re.compile(r'(?<=[\.!?;:])\s+')
+
+
+def split_sentences(text, normalize=None):
+    """
+    Splits a document into paragraphs (at empty lines) and these into sentences (at sentence punctuation followed by
+    whitespace); with normalize, every paragraph is normalized as a whole before it is split, since the period of
+    ordinals, dates and abbreviations (e.g. "am 3. Oktober", "Dr. Müller") is no sentence end
+
+    Paragraphs are normalized lazily, i.e. a consumer synthesizing the sentences of one paragraph overlaps with the
+    normalization of the next one
+
+    :param text: document text
+    :param normalize: optional callable applied to every paragraph (e.g. GermanTransliterate.transliterate)
+    :return: generator of non-empty sentences
+    """
+    for paragraph in DETECT_PARAGRAPH_END.split(text):
+        if normalize and paragraph.strip():
+            paragraph = normalize(paragraph)
+        for sentence in DETECT_SENTENCE_END.split(paragraph):
+            if sentence.strip():
+                yield sentence.strip()
+
+
+class SentencePipeline:
+    """
+    Synthesizes long documents sentence by sentence: normalization, text-to-mel and mel-to-wav of different sentences
+    run concurrently on a bounded thread pool (tensorflow releases the GIL), the audio is yielded in sentence order
+    """
+
+    def __init__(self, synthesizer, normalize=None, batcher=None, workers=4, silence=0.25):
+        """
+        Constructor
+
+        :param synthesizer: loaded Synthesizer instance
+        :param normalize: optional callable applied to every paragraph before it is split into sentences (e.g. GermanTransliterate.transliterate, see split_sentences)
+        :param batcher: optional DynamicBatcher, concurrent sentences are then batched into one tacotron2 forward pass
+        :param workers: number of sentences in flight
+        :param silence: gap of silence between two sentences (in seconds)
+        """
+        self.synthesizer = synthesizer
+        self.normalize = normalize
+        self.text_to_mel = batcher.text_to_mel if batcher else synthesizer.text_to_mel
+        self.workers = workers
+        self.silence = np.zeros(int(silence * SAMPLE_RATE), dtype=np.float32)
+
+    def _synthesize_sentence(self, sentence, speaker_id):
+        mel_outputs = self.text_to_mel(self.synthesizer.text_to_sequence(sentence), speaker_id)
+        return self.synthesizer.mel_to_wav(mel_outputs)
+
+    def stream(self, text, speaker_id=0):
+        """
+        Synthesizes a document and yields its audio sentence by sentence (in order, separated by silence)
+
+        :param text: document text
+        :param speaker_id: speaker id passed to tacotron2
+        :return: generator of float32 audio chunks
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = collections.deque()
+            first = True
+            for sentence in split_sentences(text, self.normalize):
+                futures.append(executor.submit(self._synthesize_sentence, sentence, speaker_id))
+                # at most 2 * workers sentences are in flight, which bounds memory for long documents
+                if len(futures) < 2 * self.workers:
+                    continue
+                if not first:
+                    yield self.silence
+                first = False
+                yield futures.popleft().result()
+            while futures:
+                if not first:
+                    yield self.silence
+                first = False
+                yield futures.popleft().result()
+
+    def synthesize(self, text, speaker_id=0):
+        """
+        :param text: document text
+        :param speaker_id: speaker id passed to tacotron2
+        :return: audio of the whole document as numpy array
+        """
+        chunks = list(self.stream(text, speaker_id))
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Synthesize a long document sentence by sentence in parallel')
+    parser.add_argument('input', help='text file to be synthesized')
+    parser.add_argument('--output', default='./audio.wav')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--silence', type=float, default=0.25, help='gap between sentences in seconds')
+    parser.add_argument('--german', action='store_true', help='normalize sentences with GermanTransliterate')
+    args = parser.parse_args()
+
+    normalize = None
+    if args.german:
+        from german_transliterate.core import GermanTransliterate
+        normalize = GermanTransliterate().transliterate
+
+    with open(args.input, encoding='utf-8') as f:
+        document = f.read()
+
+    synthesizer = Synthesizer()
+    pipeline = SentencePipeline(synthesizer, normalize=normalize, workers=args.workers, silence=args.silence)
+
+    started_at = time.perf_counter()
+    # the chunks alternate between the audio of a sentence and silence
+    chunks = list(pipeline.stream(document))
+    audio = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    elapsed = time.perf_counter() - started_at
+
+    sf.write(args.output, audio, SAMPLE_RATE, "PCM_16")
+    print('%d sentences, %.2fs audio in %.2fs (real-time factor %.3f)'
+          % ((len(chunks) + 1) // 2, len(audio) / SAMPLE_RATE, elapsed,
+             elapsed / max(len(audio) / SAMPLE_RATE, 1e-9)), file=sys.stderr)
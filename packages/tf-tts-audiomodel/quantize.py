@@ -0,0 +1,142 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+sys.path.append("3rdparty")
+
+from synthesizer import Synthesizer
+from synthesizer import TFLiteVocoder
+from synthesizer import SAMPLE_RATE
+
+QUANTIZATION_MODES = ('dynamic', 'float16', 'int8')
+
+# fixed text set for the representative dataset (int8) and for the quality check
+EVALUATION_TEXTS = [
+    "The react-declarative template engine allows you build highly customizable forms without side effects in truly functional style",
+    "Please enter your password.",
+    "Your order number is four hundred and twelve, it will be shipped tomorrow morning.",
+    "Thank you for calling, how can I help you today?",
+    "The quick brown fox jumps over the lazy dog.",
+    "Temperatures will reach twenty five degrees in the afternoon, with light winds from the west.",
+]
+
+
+def convert(mb_melgan, mode, representative_mels=()):
+    """
+    Converts mb_melgan to a post-training quantized TFLite model
+
+    :param mb_melgan: mb_melgan model as loaded by TFAutoModel.from_pretrained
+    :param mode: 'dynamic' (int8 weights, float activations), 'float16' (float16 weights) or 'int8' (int8 weights and activations, calibrated on representative_mels)
+    :param representative_mels: mel outputs with shape [1, frames, n_mels] used for calibration (mode 'int8' only)
+    :return: the TFLite flatbuffer (bytes)
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError('Unknown quantization mode: ' + mode)
+
+    inference = getattr(mb_melgan, 'inference_tflite', mb_melgan.inference)
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([inference.get_concrete_function()])
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+
+    if mode == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == 'int8':
+        def representative_dataset():
+            for mel in representative_mels:
+                yield [np.asarray(mel, dtype=np.float32)]
+
+        converter.representative_dataset = representative_dataset
+        # ops without int8 kernel fall back to float, the model input/output stays float32
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8, tf.lite.OpsSet.TFLITE_BUILTINS,
+                                               tf.lite.OpsSet.SELECT_TF_OPS]
+
+    return converter.convert()
+
+
+def log_spectral_distance(reference, estimate, n_fft=1024, hop_length=256, eps=1e-8):
+    """
+    Log-spectral distance (in dB) between two waveforms, averaged over the STFT frames
+
+    :param reference: audio of the float model
+    :param estimate: audio of the quantized model
+    :param n_fft: STFT window size
+    :param hop_length: STFT hop size
+    :param eps: floor of the power spectra
+    :return: distance in dB (0 means identical spectra)
+    """
+    n = min(len(reference), len(estimate))
+    window = np.hanning(n_fft)
+
+    def power_spectrum(audio):
+        frames = [audio[start:start + n_fft] * window for start in range(0, n - n_fft + 1, hop_length)]
+        return np.abs(np.fft.rfft(np.asarray(frames), axis=1)) ** 2 + eps
+
+    if n < n_fft:
+        return 0.0
+    diff = 10 * np.log10(power_spectrum(reference[:n])) - 10 * np.log10(power_spectrum(estimate[:n]))
+    return float(np.mean(np.sqrt(np.mean(diff ** 2, axis=1))))
+
+
+def evaluate(synthesizer, vocoder, texts=EVALUATION_TEXTS):
+    """
+    Compares a (quantized) vocoder with the float mb_melgan of the synthesizer on the same tacotron2 mel outputs
+
+    :param synthesizer: loaded Synthesizer instance (with the float mb_melgan)
+    :param vocoder: TFLiteVocoder to be evaluated
+    :param texts: fixed text set
+    :return: dict with the spectral distance and the vocoder real-time factors
+    """
+    distances = []
+    float_time = quantized_time = audio_seconds = 0.0
+    for text in texts:
+        mel_outputs = synthesizer.text_to_mel(synthesizer.text_to_sequence(text))
+
+        started_at = time.perf_counter()
+        reference = synthesizer.mel_to_wav(mel_outputs)
+        float_time += time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        estimate = np.asarray(vocoder.inference(mel_outputs))[0, :, 0]
+        quantized_time += time.perf_counter() - started_at
+
+        audio_seconds += len(reference) / SAMPLE_RATE
+        distances.append(log_spectral_distance(reference, estimate))
+
+    return {
+        'texts': len(texts),
+        'log_spectral_distance_mean': float(np.mean(distances)),
+        'log_spectral_distance_max': float(np.max(distances)),
+        'float_real_time_factor': float_time / audio_seconds,
+        'quantized_real_time_factor': quantized_time / audio_seconds,
+        'speedup': float_time / quantized_time,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Post-training quantization of mb_melgan to TFLite with quality check')
+    parser.add_argument('--mode', choices=QUANTIZATION_MODES, default='dynamic')
+    parser.add_argument('--output', default=None, help='path of the .tflite file (default: mb_melgan_<mode>.tflite)')
+    parser.add_argument('--max-distance', type=float, default=None,
+                        help='exit with an error if the mean log-spectral distance (dB) exceeds this value')
+    args = parser.parse_args()
+
+    output = args.output or 'mb_melgan_%s.tflite' % args.mode
+
+    synthesizer = Synthesizer()
+    representative_mels = [synthesizer.text_to_mel(synthesizer.text_to_sequence(text)) for text in EVALUATION_TEXTS]
+    with open(output, 'wb') as f:
+        f.write(convert(synthesizer.mb_melgan, args.mode, representative_mels))
+
+    report = evaluate(synthesizer, TFLiteVocoder(output))
+    report['mode'] = args.mode
+    report['model_path'] = output
+    print(json.dumps(report, indent=2))
+
+    if args.max_distance is not None and report['log_spectral_distance_mean'] > args.max_distance:
+        print('ERROR: log-spectral distance %.3f dB exceeds %.3f dB'
+              % (report['log_spectral_distance_mean'], args.max_distance), file=sys.stderr)
+        sys.exit(1)
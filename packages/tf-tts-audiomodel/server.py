@@ -0,0 +1,239 @@
+import argparse
+import collections
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import soundfile as sf
+
+sys.path.append("3rdparty")
+
+from batcher import DynamicBatcher
+from cache import AudioCache
+from cache import MelCache
+from cache import normalize_text
+from metrics import StageTracer
+from metrics import percentile
+from synthesizer import Synthesizer
+from synthesizer import SAMPLE_RATE
+
+# number of most recent request latencies kept for the /stats percentiles
+LATENCY_WINDOW = 1000
+
+
+class SynthesisService:
+    """
+    Long-lived synthesis service: the models are loaded once and shared by all requests
+    """
+
+    def __init__(self, synthesizer, max_batch_size=8, cache=None, mel_cache=None):
+        """
+        Constructor
+
+        :param synthesizer: loaded Synthesizer instance
+        :param max_batch_size: maximum number of concurrent requests batched into one tacotron2 forward pass
+        :param cache: optional AudioCache, repeated utterances are then served without running the models
+        :param mel_cache: optional MelCache, recurring clauses then skip tacotron2
+        """
+        self.synthesizer = synthesizer
+        self.cache = cache
+        self.mel_cache = mel_cache
+        self.batcher = DynamicBatcher(synthesizer, max_batch_size=max_batch_size)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def synthesize(self, text, speaker_id=0):
+        """
+        Synthesizes the given text as WAV file contents
+
+        :param text: text to be synthesized
+        :param speaker_id: speaker id passed to tacotron2
+        :return: tuple of WAV bytes and synthesis latency in seconds
+        """
+        tracer = self.synthesizer.tracer
+        started_at = time.perf_counter()
+        key = self.cache.key_for(self.synthesizer, text, speaker_id) if self.cache else None
+        audio = self.cache.get(key) if self.cache else None
+        if audio is None:
+            if self.mel_cache:
+                mel_outputs = self.mel_cache.text_to_mel(self.synthesizer, text, speaker_id, self.batcher)
+            else:
+                with tracer.span('normalization', size=len(text)):
+                    text = normalize_text(text)
+                input_ids = self.synthesizer.text_to_sequence(text)
+                mel_outputs = self.batcher.text_to_mel(input_ids, speaker_id)
+            audio = self.synthesizer.mel_to_wav(mel_outputs)
+            if self.cache:
+                self.cache.put(key, audio)
+        latency = time.perf_counter() - started_at
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency)
+
+        with tracer.span('encoding', size=len(audio)):
+            buffer = io.BytesIO()
+            sf.write(buffer, audio, SAMPLE_RATE, "PCM_16", format="WAV")
+        return buffer.getvalue(), latency
+
+    def stats(self):
+        """
+        :return: dict with model load time (cold path) and request latencies (warm path)
+        """
+        latencies = sorted(self.latencies)
+        stats = {
+            'load_time': self.synthesizer.load_time,
+            'warmup_time': self.synthesizer.warmup_time,
+            'requests': self.requests,
+            'tacotron2_batches': self.batcher.batches,
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_max': latencies[-1] if latencies else None,
+        }
+        if isinstance(self.synthesizer.tracer, StageTracer):
+            stats['stages'] = self.synthesizer.tracer.summary()
+        if self.cache:
+            stats['cache'] = self.cache.stats()
+        if self.mel_cache:
+            stats['mel_cache'] = self.mel_cache.stats()
+        return stats
+
+
+class SynthesisRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /synthesize with JSON {"text": ..., "speaker_id": ...} (or plain text) responds with audio/wav,
+    GET /stats responds with the load time and latency figures of the service
+    """
+
+    service = None
+
+    def do_GET(self):
+        if self.path != '/stats':
+            self.send_error(404)
+            return
+        self._send(200, 'application/json', json.dumps(self.service.stats()).encode('utf-8'))
+
+    def do_POST(self):
+        if self.path != '/synthesize':
+            self.send_error(404)
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            self.send_error(400, 'Invalid Content-Length')
+            return
+        try:
+            body = self.rfile.read(length).decode('utf-8')
+        except UnicodeDecodeError:
+            self.send_error(400, 'Body is not valid UTF-8')
+            return
+
+        speaker_id = 0
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            try:
+                payload = json.loads(body)
+                text = payload['text']
+                speaker_id = payload.get('speaker_id', 0)
+                if not isinstance(text, str):
+                    raise TypeError('text is not a string')
+                # bool is a subclass of int, but not a speaker id
+                if not isinstance(speaker_id, int) or isinstance(speaker_id, bool):
+                    raise TypeError('speaker_id is not an integer')
+            except (ValueError, KeyError, TypeError):
+                self.send_error(400, 'Expected JSON object with a string "text" field and an integer "speaker_id" field (optional)')
+                return
+        else:
+            text = body
+
+        if not text.strip():
+            self.send_error(400, 'No text given')
+            return
+
+        try:
+            wav, latency = self.service.synthesize(text, speaker_id)
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            self.send_error(500, 'Synthesis failed: %s' % type(e).__name__)
+            return
+        self._send(200, 'audio/wav', wav, {'X-Synthesis-Time': '%.6f' % latency,
+                                           'X-Load-Time': '%.6f' % self.service.synthesizer.load_time})
+
+    def _send(self, status, content_type, body, headers={}):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # unix sockets do not have a (host, port) client address
+        return self.client_address[0] if self.client_address else 'unix'
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Persistent Tacotron2 + MB-MelGAN synthesis server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--socket', default=None, help='serve on this unix socket path instead of host:port')
+    parser.add_argument('--export-dir', default=None, help='load the models from a directory written by export.py')
+    parser.add_argument('--vocoder-tflite', default=None, help='use a (quantized) mb_melgan written by quantize.py')
+    parser.add_argument('--max-batch-size', type=int, default=8,
+                        help='maximum number of concurrent requests per tacotron2 forward pass')
+    parser.add_argument('--cache-dir', default=None, help='directory of the on-disk audio cache')
+    parser.add_argument('--cache-memory-mb', type=int, default=0, help='size of the in-memory audio cache, 0 disables')
+    parser.add_argument('--cache-disk-mb', type=int, default=1024, help='size of the on-disk audio cache')
+    parser.add_argument('--mel-cache-mb', type=int, default=0,
+                        help='size of the per-clause tacotron2 mel cache, 0 disables')
+    args = parser.parse_args()
+
+    synthesizer = Synthesizer(export_dir=args.export_dir, vocoder_tflite=args.vocoder_tflite, tracer=StageTracer())
+    print('models loaded in %.3fs, warmup took %.3fs' % (synthesizer.load_time, synthesizer.warmup_time),
+          file=sys.stderr)
+
+    cache = None
+    if args.cache_dir or args.cache_memory_mb:
+        cache = AudioCache(args.cache_dir, args.cache_memory_mb * 2 ** 20, args.cache_disk_mb * 2 ** 20)
+
+    mel_cache = MelCache(args.mel_cache_mb * 2 ** 20) if args.mel_cache_mb else None
+
+    SynthesisRequestHandler.service = SynthesisService(synthesizer, args.max_batch_size, cache, mel_cache)
+    if args.socket:
+        server = ThreadingUnixHTTPServer(args.socket, SynthesisRequestHandler)
+        print('listening on unix socket', args.socket, file=sys.stderr)
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), SynthesisRequestHandler)
+        print('listening on http://%s:%d' % (args.host, args.port), file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        SynthesisRequestHandler.service.batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.append("3rdparty")
+
+from cache import normalize_text
+from cache import split_clauses
+from synthesizer import Synthesizer
+from synthesizer import SAMPLE_RATE
+
+# number of audio samples mb_melgan generates per mel frame
+HOP_SIZE = 256
+
+
+def stream_vocode(vocoder, mel_chunks, window=32, overlap=8, hop_size=HOP_SIZE):
+    """
+    Vocodes mel frames in fixed windows as soon as they arrive and yields PCM chunks; consecutive windows share
+    `overlap` frames which are crossfaded so that the seams between the windows are not audible
+
+    :param vocoder: callable mapping mel outputs with shape [1, frames, n_mels] to audio samples (e.g. Synthesizer.mel_to_wav)
+    :param mel_chunks: iterable of mel outputs with shape [1, frames, n_mels] or [frames, n_mels], in order of arrival
+    :param window: number of mel frames emitted per vocoder call
+    :param overlap: number of mel frames vocoded twice (end of one window, start of the next one) for crossfading
+    :param hop_size: number of audio samples per mel frame
+    :return: generator of float32 audio chunks
+    """
+    fade_in = np.linspace(0.0, 1.0, overlap * hop_size, dtype=np.float32)
+    fade_out = 1.0 - fade_in
+
+    pending = None  # mel frames not emitted yet (including the overlap with the previous window)
+    tail = None  # audio of the overlap frames of the previous window, not emitted yet
+
+    def vocode(frames, last):
+        nonlocal tail
+        audio = np.asarray(vocoder(frames[np.newaxis]), dtype=np.float32)
+        if tail is not None:
+            n = min(len(tail), len(audio))
+            audio[:n] = tail[:n] * fade_out[:n] + audio[:n] * fade_in[:n]
+        if last:
+            tail = None
+            return audio
+        tail = audio[window * hop_size:]
+        return audio[:window * hop_size]
+
+    for chunk in mel_chunks:
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if chunk.ndim == 3:
+            chunk = chunk[0]
+        pending = chunk if pending is None else np.concatenate([pending, chunk])
+        # a window is vocoded once its overlap frames (look-ahead for the crossfade) are available, too
+        while len(pending) >= window + overlap:
+            yield vocode(pending[:window + overlap], last=False)
+            pending = pending[window:]
+
+    if pending is not None and len(pending):
+        yield vocode(pending, last=True)
+
+
+def stream_synthesize(synthesizer, text, speaker_id=0, window=32, overlap=8):
+    """
+    Synthesizes the given text and yields the audio in chunks (see stream_vocode)
+
+    tacotron2 inference runs as one graph (the decoder loop included) and does not expose its frames while decoding,
+    thus the text is split into clauses (see cache.split_clauses) whose mels are computed lazily, one after the other:
+    the first chunk is vocoded as soon as the mel of the first clause is there, the mels of the following clauses
+    are computed while the audio before is consumed
+
+    :param synthesizer: loaded Synthesizer instance
+    :param text: text to be synthesized
+    :param speaker_id: speaker id passed to tacotron2
+    :param window: number of mel frames emitted per vocoder call
+    :param overlap: number of mel frames crossfaded between consecutive windows
+    :return: generator of float32 audio chunks
+    """
+    def clause_mels():
+        for clause in split_clauses(text) or [normalize_text(text)]:
+            yield synthesizer.text_to_mel(synthesizer.text_to_sequence(clause), speaker_id)
+
+    return stream_vocode(synthesizer.mel_to_wav, clause_mels(), window, overlap)
+
+
+def measure(chunks, started_at):
+    """
+    :param chunks: iterable of audio chunks
+    :param started_at: time.perf_counter() value when the request was made
+    :return: tuple of (audio, time to first audio in seconds, real-time factor)
+    """
+    audio = []
+    time_to_first_audio = None
+    for chunk in chunks:
+        if time_to_first_audio is None:
+            time_to_first_audio = time.perf_counter() - started_at
+        audio.append(chunk)
+    elapsed = time.perf_counter() - started_at
+    audio = np.concatenate(audio) if audio else np.zeros(0, dtype=np.float32)
+    real_time_factor = elapsed / (len(audio) / SAMPLE_RATE) if len(audio) else None
+    return audio, time_to_first_audio, real_time_factor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time to first audio and real-time factor: whole vs. streamed (per clause) '
+                                                 'synthesis')
+    parser.add_argument('text', nargs='?',
+                        default="The react-declarative template engine allows you build highly customizable forms "
+                                "without side effects in truly functional style")
+    parser.add_argument('--window', type=int, default=32)
+    parser.add_argument('--overlap', type=int, default=8)
+    parser.add_argument('--output', default='./audio_streamed.wav')
+    args = parser.parse_args()
+
+    synthesizer = Synthesizer()
+
+    started_at = time.perf_counter()
+    _, ttfa, rtf = measure([synthesizer.synthesize(args.text)], started_at)
+    print('whole:    time to first audio %.3fs, real-time factor %.3f' % (ttfa, rtf))
+
+    started_at = time.perf_counter()
+    audio, ttfa, rtf = measure(stream_synthesize(synthesizer, args.text, window=args.window, overlap=args.overlap),
+                               started_at)
+    print('streamed: time to first audio %.3fs (%d clauses), real-time factor %.3f'
+          % (ttfa, len(split_clauses(args.text)), rtf))
+
+    sf.write(args.output, audio, SAMPLE_RATE, "PCM_16")
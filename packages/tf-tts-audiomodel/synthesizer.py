@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_tts.inference import AutoProcessor
+from tensorflow_tts.inference import TFAutoModel
+
+from metrics import NULL_TRACER
+
+tf.config.set_visible_devices([], 'GPU')
+
+PROCESSOR_NAME = "tensorspeech/tts-tacotron2-ljspeech-en"
+TACOTRON2_NAME = "tensorspeech/tts-tacotron2-ljspeech-en"
+MB_MELGAN_NAME = "tensorspeech/tts-mb_melgan-ljspeech-en"
+
+SAMPLE_RATE = 22050
+
+# id of the padding symbol of the processor, used for padding batched input ids
+PAD_ID = 0
+
+WARMUP_TEXT = "Warm up."
+
+# layout of a directory written by export.py (see Synthesizer parameter export_dir)
+EXPORT_PROCESSOR = "processor.json"
+EXPORT_TACOTRON2 = "tacotron2"
+EXPORT_MB_MELGAN = "mb_melgan"
+EXPORT_META = "meta.json"
+
+
+class Synthesizer:
+    """
+    Keeps the processor, tacotron2 and mb_melgan resident so that they are loaded once and reused for every utterance
+    """
+
+    def __init__(self,
+                 processor_name=PROCESSOR_NAME,
+                 tacotron2_name=TACOTRON2_NAME,
+                 mb_melgan_name=MB_MELGAN_NAME,
+                 warmup=True,
+                 export_dir=None,
+                 vocoder_tflite=None,
+                 tracer=None
+                 ):
+        """
+        Constructor
+
+        :param processor_name: name or path passed to AutoProcessor.from_pretrained
+        :param tacotron2_name: name or path of the text-to-mel model passed to TFAutoModel.from_pretrained
+        :param mb_melgan_name: name or path of the mel-to-wav model passed to TFAutoModel.from_pretrained
+        :param warmup: if True, one short utterance is synthesized right away so that the graph build is paid here
+        :param export_dir: directory written by export.py; if given, the exported SavedModels with fixed input signatures are loaded instead of calling from_pretrained (the names are then taken from the export)
+        :param vocoder_tflite: path of a (quantized) mb_melgan written by quantize.py; if given, it replaces the mb_melgan model
+        :param tracer: optional tracer (e.g. metrics.StageTracer) which gets a timed span per stage (text_to_sequence, tacotron2, vocoder)
+        """
+        self.tracer = tracer or NULL_TRACER
+
+        started_at = time.perf_counter()
+        if export_dir:
+            with open(os.path.join(export_dir, EXPORT_META), encoding='utf-8') as f:
+                meta = json.load(f)
+            processor_name = meta['processor_name']
+            tacotron2_name = meta['tacotron2_name']
+            mb_melgan_name = meta['mb_melgan_name']
+            self.processor = AutoProcessor.from_pretrained(os.path.join(export_dir, EXPORT_PROCESSOR))
+            self.tacotron2 = tf.saved_model.load(os.path.join(export_dir, EXPORT_TACOTRON2))
+            self.mb_melgan = tf.saved_model.load(os.path.join(export_dir, EXPORT_MB_MELGAN))
+        else:
+            self.processor = AutoProcessor.from_pretrained(processor_name)
+            self.tacotron2 = TFAutoModel.from_pretrained(tacotron2_name)
+            self.mb_melgan = TFAutoModel.from_pretrained(mb_melgan_name)
+        if vocoder_tflite:
+            self.mb_melgan = TFLiteVocoder(vocoder_tflite)
+            mb_melgan_name = mb_melgan_name + '#' + os.path.basename(vocoder_tflite)
+        self.load_time = time.perf_counter() - started_at
+
+        self.processor_name = processor_name
+        self.tacotron2_name = tacotron2_name
+        self.mb_melgan_name = mb_melgan_name
+
+        self.warmup_time = 0.0
+        if warmup:
+            started_at = time.perf_counter()
+            self.synthesize(WARMUP_TEXT)
+            self.warmup_time = time.perf_counter() - started_at
+
+    def text_to_sequence(self, text):
+        """
+        Converts text into the input ids of tacotron2
+
+        :param text: text to be synthesized
+        :return: list of input ids
+        """
+        with self.tracer.span('text_to_sequence', size=len(text)):
+            return self.processor.text_to_sequence(text)
+
+    def text_to_mel(self, input_ids, speaker_id=0):
+        """
+        Runs tacotron2 inference (text-to-mel) for a single utterance
+
+        :param input_ids: input ids as given by text_to_sequence
+        :param speaker_id: speaker id passed to tacotron2
+        :return: mel outputs with shape [1, frames, n_mels]
+        """
+        with self.tracer.span('tacotron2', size=len(input_ids)):
+            decoder_output, mel_outputs, stop_token_prediction, alignment_history = self.tacotron2.inference(
+                input_ids=tf.expand_dims(tf.convert_to_tensor(input_ids, dtype=tf.int32), 0),
+                input_lengths=tf.convert_to_tensor([len(input_ids)], tf.int32),
+                speaker_ids=tf.convert_to_tensor([speaker_id], dtype=tf.int32),
+            )
+        return mel_outputs
+
+    def text_to_mel_batch(self, input_ids_list, speaker_ids):
+        """
+        Runs tacotron2 inference (text-to-mel) for several utterances in one forward pass
+
+        :param input_ids_list: list of input ids (as given by text_to_sequence), one per utterance
+        :param speaker_ids: list of speaker ids, one per utterance
+        :return: list of mel outputs with shape [1, frames, n_mels], each cut at its own stop token
+        """
+        input_lengths = [len(input_ids) for input_ids in input_ids_list]
+        padded = np.full((len(input_ids_list), max(input_lengths)), PAD_ID, dtype=np.int32)
+        for idx, input_ids in enumerate(input_ids_list):
+            padded[idx, :len(input_ids)] = input_ids
+
+        with self.tracer.span('tacotron2_batch', size=int(padded.size), batch_size=len(input_ids_list)):
+            decoder_output, mel_outputs, stop_token_prediction, alignment_history = self.tacotron2.inference(
+                input_ids=tf.convert_to_tensor(padded, dtype=tf.int32),
+                input_lengths=tf.convert_to_tensor(input_lengths, tf.int32),
+                speaker_ids=tf.convert_to_tensor(speaker_ids, dtype=tf.int32),
+            )
+
+        # the decoder keeps running until the *last* item of the batch stops, so every item is cut at the
+        # first frame of its own stop token prediction (logits, i.e. sigmoid > 0.5 means stop)
+        mel_outputs = mel_outputs.numpy()
+        stop_token_prediction = stop_token_prediction.numpy()
+        mels = []
+        for idx in range(len(input_ids_list)):
+            stops = np.flatnonzero(stop_token_prediction[idx] > 0)
+            frames = stops[0] + 1 if len(stops) else mel_outputs.shape[1]
+            mels.append(mel_outputs[idx:idx + 1, :frames])
+        return mels
+
+    def mel_to_wav(self, mel_outputs):
+        """
+        Runs mb_melgan inference (mel-to-wav)
+
+        :param mel_outputs: mel outputs with shape [1, frames, n_mels]
+        :return: audio samples as numpy array
+        """
+        with self.tracer.span('vocoder', size=int(mel_outputs.shape[1])):
+            return np.asarray(self.mb_melgan.inference(mel_outputs))[0, :, 0]
+
+    def synthesize(self, text, speaker_id=0):
+        """
+        Synthesizes the given text
+
+        :param text: text to be synthesized
+        :param speaker_id: speaker id passed to tacotron2
+        :return: audio samples as numpy array (see SAMPLE_RATE)
+        """
+        input_ids = self.text_to_sequence(text)
+        mel_outputs = self.text_to_mel(input_ids, speaker_id)
+        return self.mel_to_wav(mel_outputs)
+
+
+class TFLiteVocoder:
+    """
+    Runs a TFLite mb_melgan (see quantize.py) behind the same inference() interface as the TFAutoModel
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        """
+        Constructor
+
+        :param model_path: path of the .tflite file
+        :param num_threads: number of threads of the interpreter, None lets TFLite decide
+        """
+        self.model_path = model_path
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.lock = threading.Lock()
+
+    def inference(self, mel_outputs):
+        """
+        :param mel_outputs: mel outputs with shape [1, frames, n_mels]
+        :return: audio with shape [1, samples, 1] as numpy array
+        """
+        mel_outputs = np.asarray(mel_outputs, dtype=np.float32)
+        # the interpreter holds per-shape buffers, so calls are serialized
+        with self.lock:
+            self.interpreter.resize_tensor_input(self.input_index, mel_outputs.shape)
+            self.interpreter.allocate_tensors()
+            self.interpreter.set_tensor(self.input_index, mel_outputs)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index)
@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PACKAGE_DIR, '3rdparty'))
+
+from german_transliterate.core import GermanTransliterate
+from german_transliterate.core import TransliterationMemo
+
+DIFFERENTIAL_CORPUS = os.path.join(PACKAGE_DIR, 'benchmark_corpus_de.txt')
+
+# configurations the engines are compared with (constructor keywords of GermanTransliterate)
+CONFIGS = [
+    {},
+    dict(transliterate_ops=['accent_peculiarity', 'amount_money', 'date', 'timestamp', 'time_of_day', 'ordinal',
+                            'special']),
+    dict(transliterate_ops=['acronym_phoneme', 'accent_peculiarity', 'amount_money', 'date', 'timestamp',
+                            'time_of_day', 'weekday', 'month', 'ordinal', 'special', 'math_symbol', 'spoken_symbol']),
+    dict(replace={';': ',', ':': ' '}, sep_abbreviation=' -- '),
+    dict(make_lowercase=False),
+    dict(transliterate_ops=['spoken_symbol', 'ordinal', 'math_symbol', 'month', 'weekday'], replace={}),
+]
+
+# single words at the edges of the trigger of engine 'prefilter' (no digits or symbols, but abbreviations, units,
+# weekday/month patterns or replace keys)
+WORDS = ['z.B.', 'bzw.', 'Nr.', 'ca.', 'km', 'kg', 'km/h', 'm²', '5km', '3.', 'Mo.', 'Montag', 'Jan.', 'Januar',
+         'März', 'Mrz.', 'Straße', 'Café', 'naïve', 'usw.', 'u.a.', 'Dr.', '§', '%', '&', '+', '=', '(Klammer)',
+         '"zitiert"', 'semi;kolon', 'doppel:punkt', 'EU', 'USA', 'CDU-Politiker', 'Hallo', '']
+
+
+def outcome(transliterator, text):
+    try:
+        with contextlib.redirect_stderr(io.StringIO()):
+            return transliterator.transliterate(text)
+    except Exception as e:
+        # both engines must fail alike, too
+        return 'exception: ' + type(e).__name__
+
+
+class EngineDifferentialTest(unittest.TestCase):
+    """
+    Differential test of engine 'prefilter' (and of the sentence memo) against engine 'sequential' (the reference)
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with open(DIFFERENTIAL_CORPUS, encoding='utf-8') as f:
+            cls.lines = [line.rstrip('\n') for line in f if line.strip()]
+        cls.words = sorted({word for line in cls.lines for word in line.split()}) + WORDS
+
+    def assert_same_outcome(self, texts, config, engine, memo=None):
+        reference = GermanTransliterate(**config)
+        transliterator = GermanTransliterate(engine=engine, memo=memo, **config)
+        for text in texts:
+            with self.subTest(config=config, text=text):
+                self.assertEqual(outcome(transliterator, text), outcome(reference, text))
+
+    def test_prefilter_corpus(self):
+        for config in CONFIGS:
+            self.assert_same_outcome(self.lines, config, 'prefilter')
+
+    def test_prefilter_words(self):
+        for config in CONFIGS:
+            self.assert_same_outcome(self.words, config, 'prefilter')
+
+    def test_memo_corpus(self):
+        for engine in GermanTransliterate.ENGINES:
+            # twice, so the second pass is served from the memo
+            self.assert_same_outcome(self.lines * 2, {}, engine, memo=TransliterationMemo(2 ** 20))
+
+    def test_prefilter_skips_plain_words(self):
+        transliterator = GermanTransliterate(engine='prefilter')
+        self.assertIsNone(transliterator.word_trigger.search('hallo'))
+        self.assertIsNotNone(transliterator.word_trigger.search('5km'))
+
+    def test_unknown_engine(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(ValueError):
+                GermanTransliterate(engine='fused')
+
+
+if __name__ == '__main__':
+    unittest.main()